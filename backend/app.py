@@ -1,25 +1,49 @@
+import click
 from flask import Flask
 from extensions import db, migrate
 from flask_cors import CORS
 from config import Config
+from utils.db_routing import replica_router
+from utils.file_storage import content_store, StreamingUploadRequest
+from utils.document_previews import preview_generator
 
 from models.user import User
 from models.loan_applications import LoanApplication
 from models.document import Document
+from models.stored_blob import StoredBlob, sweep_unreferenced_blobs
 from models.approval import Approval
 from models.loan_repayment import LoanRepayment
 from models.prediction_log import PredictionLog
+from models.prediction_stat import PredictionStat, rebuild_prediction_stats
+from models.scoring_job import ScoringJob
 
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Multipart file parts are streamed (and hashed) straight into the document store
+    app.request_class = StreamingUploadRequest
 
     CORS(app)
     db.init_app(app)
+    replica_router.init_app(app, db)
+    content_store.init_app(app)
+    preview_generator.init_app(app)
 
     migrate.init_app(app, db)
 
+    # ML model registry (loads lazily), prediction cache + background writer for PredictionLog rows
+    from ml.registry import model_registry
+    from ml.prediction_cache import prediction_cache
+    from ml.log_writer import log_writer
+    model_registry.init_app(app)
+    prediction_cache.init_app(app)
+    log_writer.init_app(app)
+
+    # Authenticated users are cached per process (see utils/jwt_utils.load_auth_user)
+    from utils.user_cache import user_cache
+    user_cache.init_app(app)
+
     # Import routes
     from routes.auth_routes import auth_bp
     from routes.loan_routes import loan_bp
@@ -38,9 +62,31 @@ def create_app():
     app.register_blueprint(ml_bp, url_prefix="/api/ml")
 
     # Dashboard Routes
-    from routes.dashboard_routes import dashboard_bp
+    from routes.dashboard_routes import dashboard_bp, dashboard_stats_cache
+    dashboard_stats_cache.init_app(app, 'DASHBOARD_STATS_CACHE_TTL')
     app.register_blueprint(dashboard_bp, url_prefix="/api/admin/dashboard")
 
+    @app.cli.command("rebuild-prediction-stats")
+    def rebuild_prediction_stats_command():
+        """Recompute the prediction_stats rollup from prediction_logs."""
+        groups = rebuild_prediction_stats()
+        db.session.commit()
+        print(f"Rebuilt prediction_stats ({groups} groups)")
+
+    @app.cli.command("sweep-document-store")
+    @click.option("--min-age", default=60, show_default=True, help="Only remove files untouched for this many minutes.")
+    def sweep_document_store_command(min_age):
+        """Delete stored document files that nothing references."""
+        removed = sweep_unreferenced_blobs(min_age * 60)
+        print(f"Removed {removed} unreferenced files from the document store")
+
+    @app.cli.command("score-loans")
+    @click.option("--once", is_flag=True, help="Exit when the queue is empty instead of polling.")
+    def score_loans_command(once):
+        """Run a worker that scores queued loan applications."""
+        from ml.scoring_queue import ScoringWorker
+        ScoringWorker(app).run(once=once)
+
     return app
 
 app = create_app()
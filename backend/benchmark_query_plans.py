@@ -0,0 +1,178 @@
+# Query-plan benchmark for the hot list/schedule/dashboard queries, with and without the lookup indexes.
+# Seeds a throwaway SQLite database, then prints EXPLAIN QUERY PLAN and timings for each query.
+# Usage (from backend/): python benchmark_query_plans.py [--loans N] [--repeat N]
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+# Point the app at a fresh SQLite file before config.py reads the environment
+DB_DIR = tempfile.mkdtemp(prefix="smartlend-plans-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'plans.db')}"
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models.user import User
+from models.loan_applications import LoanApplication
+from models.loan_repayment import LoanRepayment
+from models.document import Document
+from models.prediction_log import PredictionLog
+from controllers.loan_controller import _repayment_summary_columns
+
+# Tables whose (non-unique) indexes are added by the 00635ffdc876 migration
+INDEXED_MODELS = (LoanApplication, LoanRepayment, Document, PredictionLog)
+STATUSES = ("Pending", "Approved", "Rejected")
+
+
+def seed(n_loans, rng):
+    """Bulk-insert users, loans, repayments, documents and prediction logs."""
+    n_users = max(1, n_loans // 5)
+    start = datetime(2024, 1, 1)
+
+    db.session.execute(User.__table__.insert(), [
+        {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "password": "x", "role": "user"}
+        for i in range(1, n_users + 1)
+    ])
+    db.session.execute(PredictionLog.__table__.insert(), [
+        {"id": i, "input_features": {}, "status": rng.choice(("Approved", "Rejected")),
+         "probability": rng.random(), "created_at": start + timedelta(seconds=i * 30)}
+        for i in range(1, n_loans + 1)
+    ])
+    loans = [
+        {"id": i, "user_id": rng.randint(1, n_users), "loan_type": "Personal", "amount": 100000,
+         "tenure_months": 12, "interest_rate": 10.0, "monthly_salary": 50000, "credit_history": 700,
+         "status": rng.choice(STATUSES), "created_at": start + timedelta(seconds=i * 30), "prediction_log_id": i}
+        for i in range(1, n_loans + 1)
+    ]
+    db.session.execute(LoanApplication.__table__.insert(), loans)
+    db.session.execute(Document.__table__.insert(), [
+        {"loan_id": loan["id"], "file_name": "id.pdf", "file_path": f"uploads/{loan['id']}.pdf", "file_type": "pdf"}
+        for loan in loans if loan["id"] % 2 == 0
+    ])
+    db.session.execute(LoanRepayment.__table__.insert(), [
+        {"loan_id": loan["id"], "month_number": m, "due_date": loan["created_at"] + timedelta(days=30 * m),
+         "emi_amount": 8791.59, "paid_status": "Paid" if m <= 3 else "Pending"}
+        for loan in loans if loan["status"] == "Approved" for m in range(1, 13)
+    ])
+    db.session.commit()
+    return n_users
+
+
+def hot_queries(sample_user, sample_loan, cursor_loan):
+    """The statements the controllers and dashboard issue, with representative parameters."""
+    LA, LR = LoanApplication, LoanRepayment
+    counts, next_due = _repayment_summary_columns(sample_user)
+    return {
+        "my_loans (user_id, newest first)": db.session.query(LA).filter(LA.user_id == sample_user)
+            .order_by(LA.created_at.desc(), LA.id.desc()).limit(21),
+        "my_loans ?summary=1 (repayment aggregate)": db.session.query(LA, counts.c.paid, counts.c.unpaid, next_due.due_date)
+            .filter(LA.user_id == sample_user)
+            .outerjoin(counts, counts.c.loan_id == LA.id)
+            .outerjoin(next_due, (next_due.loan_id == LA.id) & (next_due.month_number == counts.c.next_month))
+            .order_by(LA.created_at.desc(), LA.id.desc()).limit(21),
+        "admin_loans first page": db.session.query(LA).order_by(LA.created_at.desc(), LA.id.desc()).limit(51),
+        "admin_loans keyset page": db.session.query(LA).filter(
+            (LA.created_at < cursor_loan.created_at) |
+            ((LA.created_at == cursor_loan.created_at) & (LA.id < cursor_loan.id))
+        ).order_by(LA.created_at.desc(), LA.id.desc()).limit(51),
+        "loans by status": db.session.query(LA).filter(LA.status == "Pending")
+            .order_by(LA.created_at.desc()).limit(50),
+        "repayment schedule": db.session.query(LR).filter(LR.loan_id == sample_loan).order_by(LR.month_number),
+        "documents for a loan page": db.session.query(Document).filter(Document.loan_id.in_(range(sample_loan, sample_loan + 50))),
+        "recent predictions": db.session.query(PredictionLog).order_by(PredictionLog.created_at.desc()).limit(10),
+        "predictions by status": db.session.query(PredictionLog).filter(PredictionLog.status == "Approved")
+            .order_by(PredictionLog.created_at.desc()).limit(50),
+    }
+
+
+def to_sql(query):
+    return str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+
+
+def explain(sql):
+    rows = db.session.execute(text("EXPLAIN QUERY PLAN " + sql)).fetchall()
+    return [row[-1] for row in rows]
+
+
+def time_query(sql, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.session.execute(text(sql)).fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def lookup_indexes():
+    return [index for model in INDEXED_MODELS for index in model.__table__.indexes if not index.unique]
+
+
+def measure_all(queries, repeat):
+    db.session.execute(text("ANALYZE"))
+    return {name: (explain(sql), time_query(sql, repeat)) for name, sql in queries.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare query plans for the hot lookups with and without indexes.")
+    parser.add_argument('--loans', type=int, default=100000, help="Loan applications to seed (default: 100000)")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query, median reported (default: 20)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    app = create_app()
+    rng = random.Random(args.seed)
+
+    with app.app_context():
+        db.create_all()
+
+        # 1. Seed without the lookup indexes
+        indexes = lookup_indexes()
+        for index in indexes:
+            index.drop(db.engine)
+        print(f"Seeding {args.loans} loans into {DB_DIR} ...")
+        start = time.perf_counter()
+        n_users = seed(args.loans, rng)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        sample_user = rng.randint(1, n_users)
+        sample_loan = db.session.query(LoanApplication.id).filter_by(status="Approved").first()[0]
+        cursor_loan = db.session.get(LoanApplication, args.loans // 2)
+        queries = {name: to_sql(q) for name, q in hot_queries(sample_user, sample_loan, cursor_loan).items()}
+
+        # 2. Before / after
+        before = measure_all(queries, args.repeat)
+        for index in indexes:
+            index.create(db.engine)
+        after = measure_all(queries, args.repeat)
+
+    # 3. Report
+    all_indexed = True
+    for name in queries:
+        plan_before, ms_before = before[name]
+        plan_after, ms_after = after[name]
+        uses_index = any("INDEX" in step for step in plan_after)
+        all_indexed = all_indexed and uses_index
+        print(f"\n{name}: {ms_before:.3f} ms -> {ms_after:.3f} ms ({ms_before / max(ms_after, 1e-9):.1f}x)")
+        print("  before: " + " | ".join(plan_before))
+        print("  after:  " + " | ".join(plan_after))
+
+    if all_indexed:
+        print("\nSUCCESS: every hot query uses an index")
+    else:
+        print("\nFAILURE: some hot queries still scan without an index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        shutil.rmtree(DB_DIR, ignore_errors=True)
@@ -6,11 +6,85 @@ from pathlib import Path
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+def engine_options(url):
+    """SQLAlchemy engine options for `url` from the DB_* environment variables."""
+    options = {"pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"}
+    if not url or url in ("sqlite://", "sqlite:///:memory:"):
+        # In-memory SQLite uses a single shared connection; pool sizing doesn't apply
+        return options
+
+    options.update({
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)), # seconds to wait for a free connection
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)), # seconds before a connection is replaced
+    })
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0)) # 0 = no limit
+    if statement_timeout and url.startswith("postgres"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+    return options
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Optional read replica for views marked @read_only (utils/db_routing.py); falls back to the primary
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+    SQLALCHEMY_BINDS = {"replica": {"url": DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL)}} if DATABASE_REPLICA_URL else {}
+    DB_REPLICA_RETRY_INTERVAL = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", 30)) # seconds on the primary after a replica error
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "mysuperjwtsecretkey")
     
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024 #16mb
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024 #16mb
+    # /api/documents/upload/<loan_id>/bulk: files per request, and total request size (each file still MAX_CONTENT_LENGTH)
+    DOCUMENT_BULK_MAX_FILES = int(os.getenv("DOCUMENT_BULK_MAX_FILES", 10))
+    DOCUMENT_BULK_MAX_CONTENT_LENGTH = int(os.getenv("DOCUMENT_BULK_MAX_CONTENT_LENGTH", 64 * 1024 * 1024))
+    # Content-addressed document files (<sha[0:2]>/<sha[2:4]>/<sha>); defaults to uploads/store
+    DOCUMENT_STORE_FOLDER = os.getenv("DOCUMENT_STORE_FOLDER")
+    # Let the front proxy send document bytes: "" (Flask sends them), "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd)
+    DOCUMENT_SENDFILE = os.getenv("DOCUMENT_SENDFILE", "").lower()
+    DOCUMENT_ACCEL_PREFIX = os.getenv("DOCUMENT_ACCEL_PREFIX", "/protected/documents/") # nginx internal location aliased to the store folder
+    USE_X_SENDFILE = DOCUMENT_SENDFILE == "x-sendfile"
+    # Thumbnails / first-page renders for document review, cached on disk (defaults to uploads/previews)
+    DOCUMENT_PREVIEW_FOLDER = os.getenv("DOCUMENT_PREVIEW_FOLDER")
+    DOCUMENT_PREVIEW_SIZE = int(os.getenv("DOCUMENT_PREVIEW_SIZE", 320)) # longest side in pixels
+    DOCUMENT_PREVIEW_QUALITY = int(os.getenv("DOCUMENT_PREVIEW_QUALITY", 80)) # JPEG quality
+    DOCUMENT_PREVIEW_WORKERS = int(os.getenv("DOCUMENT_PREVIEW_WORKERS", 2)) # 0 disables previews
+    DOCUMENT_PREVIEW_WAIT = float(os.getenv("DOCUMENT_PREVIEW_WAIT", 2.0)) # seconds a preview request waits for a render in progress
+    DOCUMENT_PREVIEW_RETRY_FAILED_AFTER = float(os.getenv("DOCUMENT_PREVIEW_RETRY_FAILED_AFTER", 300)) # seconds before a failed render is tried again
+
+    # ML
+    ML_BATCH_MAX_SIZE = int(os.getenv("ML_BATCH_MAX_SIZE", 5000))
+    # Loan applications are scored by `flask score-loans` workers ("queue") or during the request ("inline")
+    LOAN_SCORING_MODE = os.getenv("LOAN_SCORING_MODE", "queue")
+    SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", 50)) # applications per predict_batch call
+    SCORING_POLL_INTERVAL = float(os.getenv("SCORING_POLL_INTERVAL", 1.0)) # seconds between polls of an empty queue
+    SCORING_MAX_ATTEMPTS = int(os.getenv("SCORING_MAX_ATTEMPTS", 5))
+    SCORING_RETRY_DELAY = float(os.getenv("SCORING_RETRY_DELAY", 30)) # seconds before the first retry, doubled each time
+    SCORING_LOCK_TIMEOUT = float(os.getenv("SCORING_LOCK_TIMEOUT", 300)) # seconds before a claimed job of a dead worker is reclaimed
+    ML_MODEL_RELOAD_INTERVAL = float(os.getenv("ML_MODEL_RELOAD_INTERVAL", 5.0)) # seconds between checks for a new model version
+
+    # Repeat predictions for the same applicant profile are served from memory
+    PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 1024)) # 0 disables the cache
+    PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 300)) # seconds
+    PREDICTION_CACHE_LOG_HITS = os.getenv("PREDICTION_CACHE_LOG_HITS", "false").lower() == "true" # write a new log row on a hit
+
+    # Authenticated users cached per process; edits to a user evict it, other workers catch up within the TTL
+    AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", 4096)) # 0 disables the cache
+    AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", 60)) # seconds
+
+    # How approved loans store their repayment schedule: "materialized" (a row per month)
+    # or "virtual" (loan terms only, installments generated on read)
+    REPAYMENT_SCHEDULE_MODE = os.getenv("REPAYMENT_SCHEDULE_MODE", "materialized")
+
+    # Admin dashboard stats are cached per process; new loans/predictions invalidate it
+    DASHBOARD_STATS_CACHE_TTL = float(os.getenv("DASHBOARD_STATS_CACHE_TTL", 5)) # seconds, 0 disables the cache
+
+    # Prediction logs are written in batches by a background thread
+    PREDICTION_LOG_WRITE_BEHIND = os.getenv("PREDICTION_LOG_WRITE_BEHIND", "true").lower() == "true"
+    PREDICTION_LOG_BATCH_SIZE = int(os.getenv("PREDICTION_LOG_BATCH_SIZE", 100))
+    PREDICTION_LOG_FLUSH_INTERVAL = float(os.getenv("PREDICTION_LOG_FLUSH_INTERVAL", 1.0)) # seconds
+    PREDICTION_LOG_QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE_SIZE", 10000))
\ No newline at end of file
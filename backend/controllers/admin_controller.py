@@ -5,15 +5,66 @@ from models.loan_applications import LoanApplication
 from models.document import Document
 from models.user import User
 from extensions import db
+from flask import current_app
+import numpy as np
+from utils.amortization import monthly_emi, amortize, project_cash_flows
+from utils.document_previews import preview_generator
+from utils.repayment_schedule import (
+    SCHEDULE_MATERIALIZED, SCHEDULE_VIRTUAL, STATUS_PENDING, STATUS_PAID, INSTALLMENT_STATUSES,
+    is_virtual, due_date_for
+)
+from sqlalchemy.orm import selectinload, joinedload
+from utils.pagination import encode_cursor, decode_cursor, parse_page_size, parse_fields, keyset_before
 
-def get_all_loans():
+# Admin loan listing: page sizes and the fields a client can project
+ADMIN_LOANS_PAGE_SIZE = 50
+ADMIN_LOANS_MAX_PAGE_SIZE = 500
+ADMIN_LOAN_FIELDS = {"id", "user_id", "user_name", "amount", "type", "status", "risk_score", "scoring", "date", "documents", "ai_analysis"}
+
+def get_all_loans(args):
+    """
+    List loans newest first.
+
+    Without ?limit/?cursor this returns the full list (as before). With them it
+    returns one keyset page: {"loans": [...], "next_cursor": "..."}; pass
+    next_cursor back as ?cursor= for the following page. ?fields=a,b limits the
+    output keys, and relationships that aren't asked for are never loaded.
+    """
     try:
-        # Fetch all loans, ordered by latest first, joined with User to get names
-        loans = db.session.query(LoanApplication, User.name).join(User, LoanApplication.user_id == User.id).order_by(LoanApplication.created_at.desc()).all()
+        paginate = "limit" in args or "cursor" in args
+        try:
+            page_size = parse_page_size(args, ADMIN_LOANS_PAGE_SIZE, ADMIN_LOANS_MAX_PAGE_SIZE)
+            fields = parse_fields(args, ADMIN_LOAN_FIELDS)
+            cursor = decode_cursor(args["cursor"]) if args.get("cursor") else None
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # Fetch loans joined with User to get names, latest first (id breaks ties)
+        query = db.session.query(LoanApplication, User.name).join(User, LoanApplication.user_id == User.id)
+
+        # Eager-load only what will be serialized: 1 query per relationship, not 1 per loan
+        if fields is None or "documents" in fields:
+            query = query.options(selectinload(LoanApplication.documents))
+        if fields is None or "ai_analysis" in fields:
+            query = query.options(joinedload(LoanApplication.prediction_log))
+
+        query = query.order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
+        if cursor:
+            query = keyset_before(query, LoanApplication.created_at, LoanApplication.id, cursor)
+        if paginate:
+            # One extra row tells us whether there is a next page
+            query = query.limit(page_size + 1)
+
+        loans = query.all()
+        next_cursor = None
+        if paginate and len(loans) > page_size:
+            loans = loans[:page_size]
+            last = loans[-1][0]
+            next_cursor = encode_cursor(last.created_at, last.id)
         
         output = []
         for loan, user_name in loans:
-            output.append({
+            item = {
                 "id": loan.id,
                 "user_id": loan.user_id,
                 "user_name": user_name,
@@ -21,35 +72,31 @@ def get_all_loans():
                 "type": loan.loan_type,
                 "status": loan.status,
                 "risk_score": f"Salary: {loan.monthly_salary}, Credit: {loan.credit_history}",
-                "date": loan.created_at.isoformat(),
-                "documents": [{"id": d.id, "name": d.file_name} for d in loan.documents],
-                "ai_analysis": loan.prediction_log.to_dict() if loan.prediction_log else None
-            })
+                "scoring": loan.scoring_status,
+                "date": loan.created_at.isoformat()
+            }
+            if fields is None or "documents" in fields:
+                item["documents"] = [
+                    {"id": d.id, "name": d.file_name, "preview": preview_generator.supports(d.file_type) and d.sha256 is not None}
+                    for d in loan.documents
+                ]
+            if fields is None or "ai_analysis" in fields:
+                item["ai_analysis"] = loan.prediction_log.to_dict() if loan.prediction_log else None
+            if fields is not None:
+                item = {key: value for key, value in item.items() if key in fields}
+            output.append(item)
+
+        if paginate:
+            return {"loans": output, "next_cursor": next_cursor}, 200
         return output, 200
     except Exception as e:
         return {"error": str(e)}, 500
 
 
 
-# Helper Function for EMI
+# Helper Function for EMI (see utils/amortization.py for the formula)
 def calculate_emi(principal, annual_rate, tenure_months):
-    # 1. FORCE CONVERSION to float to avoid the error
-    P = float(principal)
-    R_annual = float(annual_rate)
-    
-    # 2. Calculate Monthly Rate
-    # R = Annual Rate / 12 / 100
-    r = R_annual / 12 / 100
-    
-    # 3. EMI Formula
-    # prevent division by zero check (optional but good practice)
-    if r == 0:
-        return round(P / tenure_months, 2)
-        
-    numerator = P * r * ((1 + r) ** tenure_months)
-    denominator = ((1 + r) ** tenure_months) - 1
-    
-    return round(numerator, 2)
+    return round(float(monthly_emi(principal, annual_rate, tenure_months)[0]), 2)
 
     
 def update_loan_status(data, loan_id):
@@ -63,32 +110,183 @@ def update_loan_status(data, loan_id):
         # 1. Update Status
         loan.status = new_status
         
-        # 2. TRIGGER: If Approved, Generate Schedule
-        if new_status == 'Approved':
-            # Calculate EMI
+        # 2. TRIGGER: If Approved, Generate Schedule (once)
+        if new_status == 'Approved' and loan.schedule_mode is None:
+            # Calculate EMI; the terms live on the loan in both schedule modes
             emi = calculate_emi(loan.amount, loan.interest_rate, loan.tenure_months)
-            
-            # Create Schedule for N months
             start_date = datetime.utcnow().date()
-            
-            for i in range(1, loan.tenure_months + 1):
-                # Calculate next month's date
-                due_date = start_date + relativedelta(months=i)
-                
-                repayment = LoanRepayment(
-                    loan_id=loan.id,
-                    month_number=i,
-                    due_date=due_date,
-                    emi_amount=emi,
-                    paid_status='Pending'
-                )
-                db.session.add(repayment)
-                
-            print(f"Generated {loan.tenure_months} EMI records of {emi} each.")
+            loan.emi_amount = emi
+            loan.schedule_start = start_date
+            loan.schedule_mode = current_app.config.get('REPAYMENT_SCHEDULE_MODE', SCHEDULE_MATERIALIZED)
+
+            if loan.schedule_mode == SCHEDULE_VIRTUAL:
+                # Nothing else to write: installments are generated when the schedule is read
+                print(f"Virtual schedule: {loan.tenure_months} EMIs of {emi} from {start_date}.")
+            else:
+                # Create Schedule for N months
+                repayments = []
+                for i in range(1, loan.tenure_months + 1):
+                    # Calculate next month's date
+                    due_date = start_date + relativedelta(months=i)
+
+                    repayments.append(LoanRepayment(
+                        loan_id=loan.id,
+                        month_number=i,
+                        due_date=due_date,
+                        emi_amount=emi,
+                        paid_status=STATUS_PENDING
+                    ))
+                db.session.add_all(repayments)
+
+                print(f"Generated {loan.tenure_months} EMI records of {emi} each.")
 
         db.session.commit()
 
         return {"message": f"Loan {loan_id} marked as {new_status}"}, 200
 
     except Exception as e:
-        return {"error": str(e)}, 500
\ No newline at end of file
+        return {"error": str(e)}, 500
+
+
+def update_installment_status(data, loan_id, month):
+    """
+    Record a payment or waiver for one installment (or set it back to Pending).
+    Virtual schedules only keep rows for installments that aren't Pending.
+    """
+    try:
+        loan = LoanApplication.query.get(loan_id)
+        if not loan:
+            return {"error": "Loan not found"}, 404
+        if loan.status != 'Approved':
+            return {"error": "Loan has no repayment schedule"}, 400
+
+        new_status = (data or {}).get('status')
+        if new_status not in INSTALLMENT_STATUSES:
+            return {"error": f"status must be one of {', '.join(INSTALLMENT_STATUSES)}"}, 400
+        if not 1 <= month <= loan.tenure_months:
+            return {"error": f"month must be between 1 and {loan.tenure_months}"}, 400
+
+        repayment = LoanRepayment.query.filter_by(loan_id=loan.id, month_number=month).first()
+
+        if is_virtual(loan):
+            if new_status == STATUS_PENDING:
+                # Pending is the generated default, so no row is needed
+                if repayment:
+                    db.session.delete(repayment)
+            else:
+                if not repayment:
+                    repayment = LoanRepayment(
+                        loan_id=loan.id,
+                        month_number=month,
+                        due_date=due_date_for(loan, month),
+                        emi_amount=loan.emi_amount
+                    )
+                    db.session.add(repayment)
+                repayment.paid_status = new_status
+                repayment.paid_at = datetime.utcnow() if new_status == STATUS_PAID else None
+        else:
+            if not repayment:
+                return {"error": "Installment not found"}, 404
+            repayment.paid_status = new_status
+            repayment.paid_at = datetime.utcnow() if new_status == STATUS_PAID else None
+
+        db.session.commit()
+
+        return {"message": f"Installment {month} of loan {loan_id} marked as {new_status}"}, 200
+
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
+# Portfolio projection horizon (months)
+PROJECTION_MONTHS = 12
+PROJECTION_MAX_MONTHS = 360
+
+def _month_index(d):
+    return d.year * 12 + d.month - 1
+
+def get_portfolio_projection(args):
+    """
+    Expected monthly principal, interest and outstanding balance across all
+    approved loans, from the current month forward (contractual schedule).
+    """
+    try:
+        try:
+            horizon = max(1, min(int(args.get("months", PROJECTION_MONTHS)), PROJECTION_MAX_MONTHS))
+        except ValueError:
+            return {"error": "months must be an integer"}, 400
+
+        # 1. Loan terms only; no per-installment rows are read
+        rows = db.session.query(
+            LoanApplication.amount, LoanApplication.interest_rate, LoanApplication.tenure_months,
+            LoanApplication.schedule_start, LoanApplication.created_at
+        ).filter(LoanApplication.status == 'Approved').all()
+
+        # 2. First installment of each loan, as a month offset from the current month
+        this_month = _month_index(datetime.utcnow())
+        principal = np.array([float(r.amount) for r in rows])
+        rate = np.array([r.interest_rate for r in rows], dtype=np.float64)
+        tenure = np.array([r.tenure_months for r in rows], dtype=np.int64)
+        # Loans approved before schedule terms were stored: assume the schedule started at application
+        offset = np.array([_month_index(r.schedule_start or r.created_at) + 1 - this_month for r in rows], dtype=np.int64)
+
+        # 3. One vectorized pass over the whole book
+        flows = project_cash_flows(principal, rate, tenure, offset, horizon) if rows else {
+            name: np.zeros(horizon) for name in ("principal", "interest", "total", "balance")
+        }
+
+        months = []
+        for i in range(horizon):
+            year, month = divmod(this_month + i, 12)
+            months.append({
+                "month": f"{year:04d}-{month + 1:02d}",
+                "principal": round(float(flows["principal"][i]), 2),
+                "interest": round(float(flows["interest"][i]), 2),
+                "total": round(float(flows["total"][i]), 2),
+                "outstanding_balance": round(float(flows["balance"][i]), 2)
+            })
+
+        return {
+            "loans": len(rows),
+            "months": months,
+            "totals": {
+                "principal": round(float(flows["principal"].sum()), 2),
+                "interest": round(float(flows["interest"].sum()), 2),
+                "total": round(float(flows["total"].sum()), 2)
+            }
+        }, 200
+
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
+def get_loan_amortization(loan_id):
+    """Month-by-month principal / interest / balance split for one loan."""
+    try:
+        loan = LoanApplication.query.get(loan_id)
+        if not loan:
+            return {"error": "Loan not found"}, 404
+
+        schedule = amortize(float(loan.amount), loan.interest_rate, loan.tenure_months)
+        start = loan.schedule_start
+
+        output = []
+        for i in range(loan.tenure_months):
+            output.append({
+                "month": i + 1,
+                "date": (start + relativedelta(months=i + 1)).strftime('%Y-%m-%d') if start else None,
+                "emi": round(float(schedule["emi"][0]), 2),
+                "principal": round(float(schedule["principal"][0, i]), 2),
+                "interest": round(float(schedule["interest"][0, i]), 2),
+                "balance": round(float(schedule["balance"][0, i]), 2)
+            })
+
+        return {
+            "loan_id": loan.id,
+            "emi": round(float(schedule["emi"][0]), 2),
+            "total_interest": round(float(schedule["interest"].sum()), 2),
+            "schedule": output
+        }, 200
+
+    except Exception as e:
+        return {"error": str(e)}, 500
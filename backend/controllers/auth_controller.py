@@ -38,7 +38,7 @@ def login_user(data):
     ):
         return {"message": "Invalid email or password"}, 401
 
-    token = create_access_token(user.id)
+    token = create_access_token(user.id, version=user.token_version)
 
     return {
         "message": "User logged in successfully",
@@ -1,9 +1,14 @@
 import os
-from flask import current_app, send_from_directory
+import mimetypes
+from flask import current_app, request, send_file, send_from_directory
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 from utils.jwt_utils import get_jwt_identity
 from models.document import Document
 from models.loan_applications import LoanApplication
+from models.stored_blob import StoredBlob
+from utils.file_storage import content_store
+from utils.document_previews import preview_generator, PREVIEW_MIMETYPE
 from extensions import db
 
 def allowed_file(filename):
@@ -34,25 +39,38 @@ def upload_document(request, loan_id):
             # Secure the filename (prevents hacking via file names)
             filename = secure_filename(file.filename)
             
-            # Create a unique name to prevent overwrites (e.g., 105_resume.pdf)
-            unique_filename = f"{loan_id}_{filename}"
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
-            
-            # 4. Save File to Disk
-            file.save(file_path)
-
-            # 5. Save Record to Database
-            new_doc = Document(
-                loan_id=loan_id,
-                file_name=filename,
-                file_path=file_path,
-                file_type=filename.rsplit('.', 1)[1].lower()
-            )
-            
-            db.session.add(new_doc)
-            db.session.commit()
+            # 4. The upload was already streamed to disk and hashed while the request
+            #    was parsed; move it to its content address (no-op if identical bytes exist)
+            upload = file.stream
+            created = content_store.commit(upload)
+
+            # 5. Save Record to Database (one more reference to the blob)
+            try:
+                StoredBlob.acquire(upload.sha256, upload.size)
+                new_doc = Document(
+                    loan_id=loan_id,
+                    file_name=filename,
+                    file_path=content_store.path_for(upload.sha256),
+                    file_type=filename.rsplit('.', 1)[1].lower(),
+                    sha256=upload.sha256
+                )
+                db.session.add(new_doc)
+                db.session.commit()
+            except Exception:
+                # A new blob left unreferenced here is removed later by `flask sweep-document-store`
+                # (deleting it now could race a concurrent upload of the same bytes)
+                db.session.rollback()
+                raise
 
-            return {"message": "File uploaded successfully", "doc_id": new_doc.id}, 201
+            # 6. Thumbnail / first-page preview for reviewers, rendered in the background
+            preview_generator.submit(upload.sha256, new_doc.file_type, new_doc.file_path)
+
+            return {
+                "message": "File uploaded successfully",
+                "doc_id": new_doc.id,
+                "sha256": upload.sha256,
+                "deduplicated": not created
+            }, 201
         
         else:
             return {"error": "File type not allowed"}, 400
@@ -60,28 +78,217 @@ def upload_document(request, loan_id):
     except Exception as e:
         return {"error": str(e)}, 500
     
-def get_document_file(document_id):
+def _bulk_file_error(file):
+    """Why a file in a bulk upload can't be stored, or None if it's fine."""
+    if file.filename == '':
+        return "No selected file"
+    if not allowed_file(file.filename):
+        return "File type not allowed"
+    if file.stream.size > current_app.config['MAX_CONTENT_LENGTH']:
+        return "File too large"
+    return None
+
+def bulk_upload_documents(request, loan_id):
+    """
+    Upload several documents for one loan in a single multipart request (any
+    field names). Every file is validated before anything is stored; if one
+    fails, none are saved and the per-file results say which and why.
+    """
+    try:
+        current_user = get_jwt_identity()
+
+        # 1. Ownership is checked once, before the request body is read
+        loan = LoanApplication.query.filter_by(id=loan_id, user_id=current_user.id).first()
+        if not loan:
+            return {"error": "Loan not found or unauthorized"}, 404
+
+        # 2. Parse the body: each file streams into the content store as it arrives.
+        #    The request may carry several files, each up to MAX_CONTENT_LENGTH
+        request.max_content_length = current_app.config['DOCUMENT_BULK_MAX_CONTENT_LENGTH']
+        try:
+            files = list(request.files.items(multi=True))
+        except RequestEntityTooLarge:
+            return {"error": "Upload too large"}, 413
+
+        if not files:
+            return {"error": "No file parts in the request"}, 400
+        max_files = current_app.config['DOCUMENT_BULK_MAX_FILES']
+        if len(files) > max_files:
+            return {"error": f"At most {max_files} files per request"}, 400
+
+        # 3. Validate everything first (all-or-nothing)
+        results = []
+        for field, file in files:
+            result = {"field": field, "name": file.filename}
+            error = _bulk_file_error(file)
+            if error:
+                result["error"] = error
+            results.append(result)
+
+        if any("error" in result for result in results):
+            # Rejected uploads are still temp files; they are removed when the request closes them
+            return {"error": "No files were uploaded; see the files marked with an error", "files": results}, 400
+
+        # 4. Move each upload to its content address and add its row, then commit once
+        documents = []
+        try:
+            for (field, file), result in zip(files, results):
+                upload = file.stream
+                filename = secure_filename(file.filename)
+                result["deduplicated"] = not content_store.commit(upload)
+
+                StoredBlob.acquire(upload.sha256, upload.size)
+                doc = Document(
+                    loan_id=loan_id,
+                    file_name=filename,
+                    file_path=content_store.path_for(upload.sha256),
+                    file_type=filename.rsplit('.', 1)[1].lower(),
+                    sha256=upload.sha256
+                )
+                db.session.add(doc)
+                documents.append(doc)
+            db.session.commit()
+        except Exception:
+            # Nothing was saved; blobs this request added are left for `flask sweep-document-store`
+            # (deleting them now could race a concurrent upload of the same bytes)
+            db.session.rollback()
+            raise
+
+        # 5. Per-file results, and previews in the background
+        for doc, result in zip(documents, results):
+            result.update(doc_id=doc.id, sha256=doc.sha256)
+            preview_generator.submit(doc.sha256, doc.file_type, doc.file_path)
+
+        return {"message": f"{len(documents)} files uploaded successfully", "files": results}, 201
+
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+def _cache_headers(response, etag):
+    # Documents are per-user: browsers may keep them but must revalidate (cheap 304s), shared caches must not
+    response.set_etag(etag)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def _accel_redirect(doc):
+    """
+    Empty response telling nginx to send the blob itself from an internal location, e.g.
+        location /protected/documents/ { internal; alias <DOCUMENT_STORE_FOLDER>/; etag off; }
+    nginx then handles Range requests and the worker is free as soon as the headers are out.
+    """
+    prefix = current_app.config['DOCUMENT_ACCEL_PREFIX'].rstrip('/')
+    response = current_app.response_class(mimetype=mimetypes.guess_type(doc.file_name)[0] or 'application/octet-stream')
+    response.headers['X-Accel-Redirect'] = f"{prefix}/{doc.sha256[:2]}/{doc.sha256[2:4]}/{doc.sha256}"
+    response.headers.set('Content-Disposition', 'inline', filename=doc.file_name)
+    return _cache_headers(response, doc.sha256)
+
+def send_document(doc):
+    """
+    Send a document inline (PDFs/images open in the browser).
+
+    Content-store documents carry a strong ETag (their sha256), answer
+    If-None-Match with 304 and support Range/If-Range. With DOCUMENT_SENDFILE
+    set, the front proxy sends the bytes instead of this worker.
+    """
+    if doc.sha256:
+        # 1. Client already has these bytes: answered from the DB row, without touching the disk
+        if request.if_none_match.contains(doc.sha256):
+            return _cache_headers(current_app.response_class(status=304), doc.sha256)
+
+        # 2. Content store: the file has no extension, so the type comes from the original name
+        path = content_store.path_for(doc.sha256)
+        if not os.path.exists(path):
+            return {"error": "File missing from server"}, 404
+        if current_app.config.get('DOCUMENT_SENDFILE') == 'x-accel-redirect':
+            return _accel_redirect(doc)
+
+        # 3. Flask/Werkzeug (or X-Sendfile when USE_X_SENDFILE is on) with Range and conditional handling
+        response = send_file(
+            path,
+            mimetype=mimetypes.guess_type(doc.file_name)[0],
+            download_name=doc.file_name,
+            conditional=True,
+            etag=doc.sha256
+        )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+
+    # Uploaded before the content store: flat UPLOAD_FOLDER, named {loan_id}_{filename}
+    # (Werkzeug's mtime/size ETag and Range support still apply)
+    directory = current_app.config['UPLOAD_FOLDER']
+    filename = os.path.basename(doc.file_path)
+    if not os.path.exists(os.path.join(directory, filename)):
+        return {"error": "File missing from server"}, 404
+    return send_from_directory(directory, filename, as_attachment=False)
+
+def send_preview(doc):
+    """Send the small JPEG preview of a document, waiting briefly if it is still being rendered."""
+    if not doc.sha256 or not preview_generator.supports(doc.file_type):
+        return {"error": "No preview available for this document"}, 404
+
+    # 1. Same bytes and preview size, same preview
+    etag = f"{doc.sha256}-{preview_generator.size}"
+    if request.if_none_match.contains(etag):
+        return _cache_headers(current_app.response_class(status=304), etag)
+
+    # 2. Not rendered yet (still queued, or the cache was cleared): queue it and wait a little
+    path = preview_generator.get(doc.sha256)
+    if path is None:
+        future = preview_generator.submit(doc.sha256, doc.file_type, content_store.path_for(doc.sha256))
+        if future is not None:
+            try:
+                path = future.result(timeout=current_app.config.get('DOCUMENT_PREVIEW_WAIT', 2.0))
+            except TimeoutError:
+                return {"message": "Preview is being generated", "status": "pending"}, 202, {"Retry-After": "1"}
+            except Exception:
+                path = None
+        if path is None:
+            return {"error": "Preview could not be generated"}, 404
+
+    response = send_file(path, mimetype=PREVIEW_MIMETYPE, conditional=True, etag=etag)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+def get_document_preview(document_id):
     try:
-        # 1. Find the document record in DB
         doc = Document.query.get(document_id)
         if not doc:
             return {"error": "Document not found"}, 404
 
-        # 2. Get the folder and filename
-        # We assume file_path stored is absolute or relative. 
-        # Safer to rely on filename + configured upload folder.
-        directory = current_app.config['UPLOAD_FOLDER']
-        filename = os.path.basename(doc.file_path)  # Ensure this matches what you saved in DB
+        return send_preview(doc)
+
+    except Exception as e:
+        return {"error": str(e)}, 500
 
-        # 3. Check if file actually exists on disk
-        full_path = os.path.join(directory, filename)
-        if not os.path.exists(full_path):
-             return {"error": "File missing from server"}, 404
+def get_my_document_preview(document_id):
+    try:
+        current_user = get_jwt_identity()
 
-        # 4. Serve the file
-        # as_attachment=False means it will open in the browser (good for PDFs/Images)
-        # as_attachment=True means it will force a download
-        return send_from_directory(directory, filename, as_attachment=False)
+        doc = Document.query.get(document_id)
+        if not doc:
+            return {"error": "Document not found"}, 404
+
+        if doc.loan.user_id != current_user.id:
+             return {"error": "Unauthorized"}, 403
+
+        return send_preview(doc)
+
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+def get_document_file(document_id):
+    try:
+        # 1. Find the document record in DB
+        doc = Document.query.get(document_id)
+        if not doc:
+            return {"error": "Document not found"}, 404
+
+        # 2. Serve the file
+        return send_document(doc)
 
     except Exception as e:
         return {"error": str(e)}, 500
@@ -99,17 +306,8 @@ def get_my_document_file(document_id):
         if doc.loan.user_id != current_user.id:
              return {"error": "Unauthorized"}, 403
 
-        # 3. Get the folder and filename
-        directory = current_app.config['UPLOAD_FOLDER']
-        filename = os.path.basename(doc.file_path)
-
-        # 4. Check if file actually exists on disk
-        full_path = os.path.join(directory, filename)
-        if not os.path.exists(full_path):
-             return {"error": "File missing from server"}, 404
-
-        # 5. Serve the file
-        return send_from_directory(directory, filename, as_attachment=False)
+        # 3. Serve the file
+        return send_document(doc)
 
     except Exception as e:
         return {"error": str(e)}, 500
\ No newline at end of file
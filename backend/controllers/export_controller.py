@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from extensions import db
+from models.loan_applications import LoanApplication
+from models.loan_repayment import LoanRepayment
+from models.prediction_log import PredictionLog
+
+# Rows fetched per round trip (server-side cursor on Postgres) and written per chunk
+EXPORT_BATCH_SIZE = 1000
+
+# What each export contains: columns in output order, plus the columns that
+# the ?start/?end and ?status filters apply to
+EXPORTS = {
+    "loans": {
+        "columns": [
+            LoanApplication.id, LoanApplication.user_id, LoanApplication.loan_type, LoanApplication.amount,
+            LoanApplication.tenure_months, LoanApplication.interest_rate, LoanApplication.monthly_salary,
+            LoanApplication.credit_history, LoanApplication.status, LoanApplication.risk_category,
+            LoanApplication.ai_confidence_score, LoanApplication.prediction_log_id, LoanApplication.schedule_mode,
+            LoanApplication.emi_amount, LoanApplication.created_at
+        ],
+        "date_column": LoanApplication.created_at,
+        "status_column": LoanApplication.status,
+    },
+    "repayments": {
+        "columns": [
+            LoanRepayment.id, LoanRepayment.loan_id, LoanRepayment.month_number, LoanRepayment.due_date,
+            LoanRepayment.emi_amount, LoanRepayment.paid_status, LoanRepayment.paid_at
+        ],
+        "date_column": LoanRepayment.due_date,
+        "status_column": LoanRepayment.paid_status,
+    },
+    "predictions": {
+        "columns": [
+            PredictionLog.id, PredictionLog.uid, PredictionLog.status, PredictionLog.probability,
+            PredictionLog.input_features, PredictionLog.top_factors, PredictionLog.created_at
+        ],
+        "date_column": PredictionLog.created_at,
+        "status_column": PredictionLog.status,
+    },
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _date_conditions(column, start, end):
+    """?start / ?end as ISO dates or datetimes; a bare end date includes that whole day."""
+    conditions = []
+    if start:
+        conditions.append(column >= datetime.fromisoformat(start))
+    if end:
+        if len(end) == 10:
+            conditions.append(column < datetime.combine(date.fromisoformat(end) + timedelta(days=1), time.min))
+        else:
+            conditions.append(column <= datetime.fromisoformat(end))
+    return conditions
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _ndjson_chunks(names, partitions):
+    for rows in partitions:
+        yield "".join(json.dumps(dict(zip(names, map(_plain, row)))) + "\n" for row in rows)
+
+
+def _csv_chunks(names, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in partitions:
+        for row in rows:
+            # JSON columns (input features, factors) go in as JSON text
+            writer.writerow([json.dumps(v) if isinstance(v, (dict, list)) else _plain(v) for v in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when there were no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_records(kind, args):
+    """
+    Stream every row of `kind` (loans, repayments, predictions) as NDJSON or CSV.
+    Filters: ?start= / ?end= (ISO date or datetime, inclusive) and ?status=.
+    Rows are fetched EXPORT_BATCH_SIZE at a time, so memory doesn't grow with the table.
+    """
+    try:
+        spec = EXPORTS.get(kind)
+        if spec is None:
+            return {"error": f"Unknown export '{kind}'. Use one of: {', '.join(EXPORTS)}"}, 404
+
+        fmt = args.get("format", "ndjson").lower()
+        if fmt not in FORMATS:
+            return {"error": f"format must be one of: {', '.join(FORMATS)}"}, 400
+
+        # 1. Filters
+        query = select(*spec["columns"])
+        try:
+            query = query.where(*_date_conditions(spec["date_column"], args.get("start"), args.get("end")))
+        except ValueError:
+            return {"error": "start and end must be ISO dates (YYYY-MM-DD) or datetimes"}, 400
+        if args.get("status"):
+            query = query.where(spec["status_column"] == args["status"])
+
+        # 2. Run the query now (inside the view, so @read_only routing and errors apply);
+        #    rows are then pulled from the cursor one batch at a time while streaming
+        query = query.order_by(spec["columns"][0]).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        result = db.session.execute(query)
+        names = [column.key for column in spec["columns"]]
+        chunks = _ndjson_chunks if fmt == "ndjson" else _csv_chunks
+
+        filename = f"{kind}-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}"
+        return Response(
+            stream_with_context(chunks(names, result.partitions())),
+            mimetype=FORMATS[fmt],
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+    except Exception as e:
+        return {"error": str(e)}, 500
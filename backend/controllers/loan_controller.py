@@ -1,16 +1,25 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from extensions import db
 from models.loan_applications import LoanApplication
-from models.user import User
 from utils.jwt_utils import get_jwt_identity
-from ml.predictor import predictor
+from ml.predictor import predictor, LOG_SESSION
+from ml.scoring_queue import enqueue_scoring, APPLY_EXPLAIN_TOP_K
+from models.scoring_job import SCORING_FAILED
 from models.prediction_log import PredictionLog
+from models.loan_repayment import LoanRepayment
+from sqlalchemy import func, case, select
+from sqlalchemy.orm import selectinload, joinedload, aliased
+from utils.pagination import encode_cursor, decode_cursor, parse_page_size, keyset_before
+from utils.repayment_schedule import SETTLED_STATUSES, is_virtual, is_settled, due_date_for, next_unsettled_month
+
+# My-loans page sizes (pagination is opt-in via ?limit / ?cursor)
+MY_LOANS_PAGE_SIZE = 20
+MY_LOANS_MAX_PAGE_SIZE = 100
 
 def apply_for_loan(data): 
     try:
         current_user = get_jwt_identity()
-        user_db = User.query.get(current_user.id)
-        if user_db.role == 'admin':
+        if current_user.role == 'admin':
             return {"error": "Admins cannot apply for loans"}, 403
         
 
@@ -41,9 +50,8 @@ def apply_for_loan(data):
             status = "Pending"
         )
 
-        # Run ML Prediction & Link Log
+        # Prepare data for predictor (bad numeric input skips scoring, not the application)
         try:
-            # Prepare data for predictor
             pred_data = {
                 "no_of_dependents": data.get("no_of_dependents", 0),
                 "education": data.get("education", "Not Graduate"), # Default fallback
@@ -57,46 +65,199 @@ def apply_for_loan(data):
                 "luxury_assets_value": 0,
                 "bank_asset_value": 0
             }
-            
-            # Predict
-            ml_result = predictor.predict(pred_data)
-            
-            if 'log_id' in ml_result and ml_result['log_id']:
-                 new_loan.prediction_log_id = ml_result['log_id']
-                 new_loan.risk_category = ml_result.get('status')
-                 new_loan.ai_confidence_score = ml_result.get('probability')
-
-        except Exception as ml_e:
+        except (TypeError, ValueError) as ml_e:
             print(f"ML Association failed: {ml_e}")
+            pred_data = None
+
+        if pred_data is None:
+            new_loan.scoring_status = SCORING_FAILED
+        elif current_app.config.get('LOAN_SCORING_MODE') == 'inline':
+            # Run ML Prediction & Link Log
+            try:
+                # Predict (log is flushed on our session and committed with the loan).
+                # Only the top factors are shown on the loan pages.
+                ml_result = predictor.predict(pred_data, log_mode=LOG_SESSION, explain=APPLY_EXPLAIN_TOP_K)
+
+                if 'log_id' in ml_result and ml_result['log_id']:
+                     new_loan.prediction_log_id = ml_result['log_id']
+                     new_loan.risk_category = ml_result.get('status')
+                     new_loan.ai_confidence_score = ml_result.get('probability')
+
+            except Exception as ml_e:
+                print(f"ML Association failed: {ml_e}")
+        else:
+            # Scored in the background by `flask score-loans`; see GET /api/loans/<id>/scoring
+            enqueue_scoring(new_loan, pred_data)
 
         db.session.add(new_loan)
         db.session.commit()
 
         return {
             "message": "Loan application submitted successfully",
-            "loan_id": new_loan.id
+            "loan_id": new_loan.id,
+            "scoring": new_loan.scoring_status
         }, 201
     except Exception as e:
         return { "error": str(e) }, 500
 
-def get_my_loans():
+def _repayment_summary_columns(user_id):
+    """
+    Per-loan installment counts and the next unpaid installment, as columns that
+    can be outer-joined onto the loan query (one statement, no per-loan lookups).
+    Only `user_id`'s repayments are aggregated, so the cost follows the caller's loans.
+    """
+    status = func.lower(LoanRepayment.paid_status)
+    is_paid = status == "paid"
+    is_settled = status.in_(SETTLED_STATUSES)
+    counts = db.session.query(
+        LoanRepayment.loan_id.label("loan_id"),
+        func.sum(case((is_paid, 1), else_=0)).label("paid"),
+        func.sum(case((is_settled, 0), else_=1)).label("unpaid"),
+        func.sum(case((is_settled, 1), else_=0)).label("settled"),
+        func.max(case((is_settled, LoanRepayment.month_number), else_=None)).label("last_settled"),
+        func.min(case((is_settled, None), else_=LoanRepayment.month_number)).label("next_month")
+    ).filter(
+        LoanRepayment.loan_id.in_(select(LoanApplication.id).where(LoanApplication.user_id == user_id))
+    ).group_by(LoanRepayment.loan_id).subquery()
+    next_due = aliased(LoanRepayment)
+    return counts, next_due
+
+def _virtual_next_months(rows):
+    """
+    Next unsettled month for virtual-schedule loans. Stored rows of a virtual
+    schedule are all settled, so when months 1..n are settled the answer is n+1;
+    only loans with gaps (e.g. a later month waived early) need their rows loaded.
+    """
+    next_months, gaps = {}, []
+    for loan, paid, unpaid, settled, last_settled, *_ in rows:
+        if not is_virtual(loan) or loan.schedule_start is None:
+            continue
+        settled = int(settled or 0)
+        if (last_settled or 0) == settled:
+            next_months[loan.id] = settled + 1 if settled < loan.tenure_months else None
+        else:
+            gaps.append(loan)
+
+    if gaps:
+        settled_months = {}
+        stored = db.session.query(LoanRepayment.loan_id, LoanRepayment.month_number, LoanRepayment.paid_status).filter(
+            LoanRepayment.loan_id.in_([loan.id for loan in gaps])
+        )
+        for loan_id, month, status in stored:
+            if is_settled(status):
+                settled_months.setdefault(loan_id, []).append(month)
+        for loan in gaps:
+            next_months[loan.id] = next_unsettled_month(loan.tenure_months, settled_months.get(loan.id, []))
+    return next_months
+
+def get_my_loans(args):
+    """
+    List the current user's loans, newest first.
+
+    Without ?limit/?cursor this returns the full list (as before); with them it
+    returns {"loans": [...], "next_cursor": "..."}. ?summary=1 adds each loan's
+    paid/unpaid installment counts and next due EMI, so loan cards don't need a
+    separate /api/repayments/<id> call.
+    """
     try:
         current_user = get_jwt_identity()
-        loans = LoanApplication.query.filter_by(user_id=current_user.id).all()
-        
-        # Serialize data
+        paginate = "limit" in args or "cursor" in args
+        summary = args.get("summary", "").lower() in ("1", "true", "yes")
+        try:
+            page_size = parse_page_size(args, MY_LOANS_PAGE_SIZE, MY_LOANS_MAX_PAGE_SIZE)
+            cursor = decode_cursor(args["cursor"]) if args.get("cursor") else None
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        # 1. Loans with documents and prediction log loaded up front
+        query = LoanApplication.query.filter_by(user_id=current_user.id).options(
+            selectinload(LoanApplication.documents),
+            joinedload(LoanApplication.prediction_log)
+        )
+
+        # 2. Repayment aggregate joined into the same statement
+        if summary:
+            counts, next_due = _repayment_summary_columns(current_user.id)
+            query = query.outerjoin(counts, counts.c.loan_id == LoanApplication.id).outerjoin(
+                next_due, (next_due.loan_id == LoanApplication.id) & (next_due.month_number == counts.c.next_month)
+            ).add_columns(counts.c.paid, counts.c.unpaid, counts.c.settled, counts.c.last_settled,
+                          next_due.month_number, next_due.due_date, next_due.emi_amount)
+
+        query = query.order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
+        if cursor:
+            query = keyset_before(query, LoanApplication.created_at, LoanApplication.id, cursor)
+        if paginate:
+            query = query.limit(page_size + 1)
+
+        rows = query.all()
+        next_cursor = None
+        if paginate and len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1][0] if summary else rows[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        # Virtual schedules have no row for pending months; work out their next due month
+        virtual_next = _virtual_next_months(rows) if summary else {}
+
+        # 3. Serialize data
         output = []
-        for loan in loans:
-            output.append({
+        for row in rows:
+            loan = row[0] if summary else row
+            item = {
                 "id": loan.id,
                 "amount": loan.amount,
                 "status": loan.status,
                 "type": loan.loan_type,
                 "date": loan.created_at.isoformat(),
                 "documents": [{"id": d.id, "name": d.file_name, "type": d.file_type} for d in loan.documents],
+                "scoring": loan.scoring_status,
                 "ai_analysis": loan.prediction_log.to_dict() if loan.prediction_log else None
-            })
-        
+            }
+            if summary:
+                _, paid, unpaid, settled, _, month, due_date, emi = row
+                if loan.id in virtual_next:
+                    unpaid = loan.tenure_months - int(settled or 0)
+                    month = virtual_next[loan.id]
+                    due_date = due_date_for(loan, month) if month is not None else None
+                    emi = loan.emi_amount
+                item["repayment_summary"] = {
+                    "paid_installments": int(paid or 0),
+                    "unpaid_installments": int(unpaid or 0),
+                    "next_due": {
+                        "month": month,
+                        "due_date": due_date.strftime('%Y-%m-%d'),
+                        "emi_amount": emi
+                    } if month is not None else None
+                }
+            output.append(item)
+
+        if paginate:
+            return {"loans": output, "next_cursor": next_cursor}, 200
         return output, 200
     except Exception as e:
-        return {"error": str(e)}, 500
\ No newline at end of file
+        return {"error": str(e)}, 500
+
+def get_scoring_status(loan_id):
+    """Where a loan's ML scoring stands: pending (queued / retrying), scored or failed."""
+    try:
+        current_user = get_jwt_identity()
+
+        loan = LoanApplication.query.get(loan_id)
+        if not loan or (loan.user_id != current_user.id and current_user.role != 'admin'):
+            return {"error": "Loan not found or unauthorized"}, 404
+
+        job = loan.scoring_job
+        result = {
+            "loan_id": loan.id,
+            "scoring": loan.scoring_status,
+            "risk_category": loan.risk_category,
+            "ai_confidence_score": loan.ai_confidence_score,
+            "prediction_log_id": loan.prediction_log_id,
+            "job": job.to_dict() if job else None
+        }
+        if job and current_user.role == 'admin':
+            result["job"]["last_error"] = job.last_error
+        return result, 200
+
+    except Exception as e:
+        return {"error": str(e)}, 500
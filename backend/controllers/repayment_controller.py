@@ -2,8 +2,19 @@ from utils.jwt_utils import get_jwt_identity
 from models.loan_repayment import LoanRepayment
 from models.loan_applications import LoanApplication
 from models.user import User
+from utils.pagination import parse_page_size
+from utils.repayment_schedule import is_virtual, virtual_installments
 
-def get_schedule(loan_id):
+# Page size when the schedule is requested with ?limit / ?from_month
+SCHEDULE_PAGE_SIZE = 12
+SCHEDULE_MAX_PAGE_SIZE = 360
+
+def get_schedule(loan_id, args):
+    """
+    Repayment schedule of a loan. Materialized schedules are read from
+    loan_repayments; virtual ones are generated from the loan terms.
+    Without ?from_month/?limit the whole schedule is returned as a list.
+    """
     try:
         current_user = get_jwt_identity()
         
@@ -21,18 +32,47 @@ def get_schedule(loan_id):
             # if user.role != 'admin':
             return {"error": "Unauthorized access to this schedule"}, 403
 
-        # 3. Fetch Repayments
-        repayments = LoanRepayment.query.filter_by(loan_id=loan_id).order_by(LoanRepayment.month_number).all()
+        # 3. Which months to return (?from_month=&limit= pages the schedule)
+        paginate = "limit" in args or "from_month" in args
+        try:
+            from_month = max(1, int(args.get("from_month", 1)))
+        except ValueError:
+            return {"error": "from_month must be an integer"}, 400
+        try:
+            count = parse_page_size(args, SCHEDULE_PAGE_SIZE, SCHEDULE_MAX_PAGE_SIZE) if paginate else None
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        last_month = loan.tenure_months if count is None else min(loan.tenure_months, from_month + count - 1)
+
+        # 4. Fetch Repayments
+        if is_virtual(loan):
+            # Generate the months on the fly; stored rows are only payments/waivers
+            stored = LoanRepayment.query.filter(
+                LoanRepayment.loan_id == loan_id,
+                LoanRepayment.month_number.between(from_month, last_month)
+            ).all()
+            output = virtual_installments(loan, {r.month_number: r for r in stored}, from_month, count)
+        else:
+            query = LoanRepayment.query.filter_by(loan_id=loan_id)
+            if paginate:
+                query = query.filter(LoanRepayment.month_number.between(from_month, last_month))
+            repayments = query.order_by(LoanRepayment.month_number).all()
 
-        output = []
-        for r in repayments:
-            output.append({
-                "month": r.month_number,
-                "date": r.due_date.strftime('%Y-%m-%d'),
-                "amount": r.emi_amount,
-                "status": r.paid_status
-            })
+            output = []
+            for r in repayments:
+                output.append({
+                    "month": r.month_number,
+                    "date": r.due_date.strftime('%Y-%m-%d'),
+                    "amount": r.emi_amount,
+                    "status": r.paid_status
+                })
 
+        if paginate:
+            return {
+                "installments": output,
+                "total_months": loan.tenure_months,
+                "next_month": last_month + 1 if last_month < loan.tenure_months else None
+            }, 200
         return output, 200
 
     except Exception as e:
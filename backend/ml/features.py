@@ -0,0 +1,31 @@
+import numpy as np
+
+# Categorical inputs and their numeric encodings (anything else encodes as 0).
+# Every other feature is numeric. The feature *order* is not defined here: it
+# is written to each model version's metadata.json by train_model.py.
+CATEGORICAL_ENCODINGS = {
+    'education': {'Graduate': 1, 'Not Graduate': 0},
+    'self_employed': {'Yes': 1, 'No': 0},
+}
+
+
+def encode_record(data, feature_order):
+    """Encode one raw input dict into a feature row in `feature_order`."""
+    row = []
+    for name in feature_order:
+        value = data.get(name, 0)
+        if name in CATEGORICAL_ENCODINGS:
+            row.append(CATEGORICAL_ENCODINGS[name].get(value, 0))
+        else:
+            row.append(float(value))
+    return row
+
+
+def encode_frame(df, feature_order):
+    """Encode a raw DataFrame (e.g. loan_approval_dataset.csv) into a float matrix in `feature_order`."""
+    df.columns = df.columns.str.strip()
+    features = df.reindex(columns=feature_order).copy()
+    for name, encoding in CATEGORICAL_ENCODINGS.items():
+        if name in features.columns:
+            features[name] = features[name].astype(str).str.strip().map(encoding)
+    return features.fillna(0).to_numpy(dtype=np.float64)
@@ -1,28 +1,27 @@
-import pickle
-import os
+# Run from backend/: python -m ml.inspect_model
 import pandas as pd
 import numpy as np
-
-# Set paths
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, 'model.pkl')
+from ml.registry import ModelRegistry
 
 def inspect_model_weights():
-    # Define features in the EXACT order used during training in train_model.py
-    feature_names = [
-        'no_of_dependents', 'education', 'self_employed', 'income_annum', 
-        'loan_amount', 'loan_term', 'cibil_score', 
-        'residential_assets_value', 'commercial_assets_value', 
-        'luxury_assets_value', 'bank_asset_value'
-    ]
-
     try:
-        with open(MODEL_PATH, 'rb') as f:
-            model = pickle.load(f)
+        bundle = ModelRegistry().get()
+        if bundle is None:
+            print("Error inspecting model: no model could be loaded")
+            return
+
+        # Features in the EXACT order used during training (from metadata.json)
+        feature_names = bundle.feature_order
+        print(f"Model version: {bundle.version}")
         
-        # Logistic Regression coefficients
-        # model.coef_[0] is an array of weights for class 1 (Approved)
-        coefficients = model.coef_[0]
+        # Logistic Regression coefficients (weights for class 1, Approved)
+        if bundle.engine is not None:
+            # Works for model.npy exports too, which have no sklearn object
+            coefficients = np.asarray(bundle.engine.coef)
+            intercept = bundle.engine.intercept
+        else:
+            coefficients = bundle.model.coef_[0]
+            intercept = bundle.model.intercept_[0]
         
         # Create a dataframe for nice display
         importance = pd.DataFrame({
@@ -39,7 +38,7 @@ def inspect_model_weights():
         print("Negative Weight = Decreases chance of Approval\n")
         print(importance.to_string(index=False))
         
-        print("\nModel Intercept:", model.intercept_[0])
+        print("\nModel Intercept:", intercept)
 
     except Exception as e:
         print(f"Error inspecting model: {e}")
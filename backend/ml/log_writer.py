@@ -0,0 +1,144 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from extensions import db
+from models.prediction_log import PredictionLog
+
+_STOP = object()
+
+
+class PredictionLogWriter:
+    """
+    Write-behind persistence for PredictionLog rows.
+
+    Request threads hand finished predictions to `submit()`, which only puts
+    them on an in-memory queue. A background thread drains the queue and
+    writes the rows in batches, flushing when `batch_size` rows are waiting
+    or `flush_interval` seconds have passed, whichever comes first.
+
+    Rows carry a `uid` assigned by the caller, so the caller has a stable
+    handle on the log before the row exists in the database.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.batch_size = 100
+        self.flush_interval = 1.0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        if not app.config.get('PREDICTION_LOG_WRITE_BEHIND', True):
+            return
+
+        # Keep the first app; verify scripts call create_app() more than once
+        if self.app is None:
+            self.app = app
+            self.batch_size = app.config.get('PREDICTION_LOG_BATCH_SIZE', self.batch_size)
+            self.flush_interval = app.config.get('PREDICTION_LOG_FLUSH_INTERVAL', self.flush_interval)
+            self._queue = queue.Queue(maxsize=app.config.get('PREDICTION_LOG_QUEUE_SIZE', 10000))
+            atexit.register(self.shutdown)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    def _ensure_started(self):
+        # Threads do not survive fork (e.g. gunicorn --preload), so start lazily per process
+        if self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, entry):
+        """
+        Queue one log row (a dict of PredictionLog columns, including `uid`).
+        Returns False when write-behind is disabled or the queue is full, in
+        which case the caller should write the row itself.
+        """
+        if self.app is None:
+            return False
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            return False
+
+    def flush(self, timeout=5.0):
+        """Block until everything submitted so far has been written."""
+        if not self.running:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def shutdown(self, timeout=5.0):
+        """Drain the queue and stop the writer thread (registered with atexit)."""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        waiters = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None and not stop:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            interval_elapsed = deadline is not None and time.monotonic() >= deadline
+            if len(batch) >= self.batch_size or interval_elapsed or waiters or stop:
+                if batch:
+                    self._write(batch)
+                for waiter in waiters:
+                    waiter.set()
+                batch, waiters, deadline = [], [], None
+
+            if stop:
+                return
+
+    def _write(self, batch):
+        with self.app.app_context():
+            try:
+                db.session.add_all([PredictionLog(**entry) for entry in batch])
+                db.session.commit()
+                print(f"{len(batch)} predictions logged to DB.")
+                return
+            except Exception as db_e:
+                print(f"Failed to log prediction batch, retrying row by row: {db_e}")
+                db.session.rollback()
+
+            # One bad row should not take the rest of the batch with it
+            for entry in batch:
+                try:
+                    db.session.add(PredictionLog(**entry))
+                    db.session.commit()
+                except Exception as db_e:
+                    print(f"Failed to log prediction {entry.get('uid')}: {db_e}")
+                    db.session.rollback()
+
+
+log_writer = PredictionLogWriter()
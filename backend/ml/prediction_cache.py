@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a TTL for single predictions.
+
+    Keys are the model version plus the encoded feature vector, so two
+    payloads that differ only in formatting ("750" vs 750.0, extra keys)
+    share an entry, and a model swap never serves stale results.
+    """
+
+    def __init__(self, max_size=1024, ttl=300.0, log_hits=False):
+        self.max_size = max_size
+        self.ttl = ttl
+        # True: a hit still writes a new PredictionLog row. False: reuse the cached log.
+        self.log_hits = log_hits
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_size = app.config.get('PREDICTION_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('PREDICTION_CACHE_TTL', self.ttl)
+        self.log_hits = app.config.get('PREDICTION_CACHE_LOG_HITS', self.log_hits)
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    @staticmethod
+    def make_key(version, features_row):
+        return (version,) + tuple(float(value) for value in features_row)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "log_hits": self.log_hits
+            }
+
+
+prediction_cache = PredictionCache()
@@ -1,34 +1,125 @@
-import pickle
-import os
+import uuid
+from datetime import datetime
 import numpy as np
 from extensions import db
 from models.prediction_log import PredictionLog
+from ml.log_writer import log_writer
+from ml.registry import model_registry
+from ml.prediction_cache import prediction_cache
+from ml.features import encode_record
 
-# Set paths
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, 'model.pkl')
-SCALER_PATH = os.path.join(BASE_DIR, 'scaler.pkl')
+# How a prediction's PredictionLog row gets persisted
+LOG_WRITE_BEHIND = 'write_behind'  # queued for the background writer, log_id not known yet
+LOG_COMMIT = 'commit'              # added and committed inline
+LOG_SESSION = 'session'            # added and flushed on the caller's session, caller commits
+
+# How much of the per-feature explanation a caller gets back (and is logged).
+# An int k in between means the k largest contributions by absolute value.
+EXPLAIN_NONE = 'none'
+EXPLAIN_FULL = 'full'
+
+def parse_explain(value):
+    """Parse an explain option: 'none', 'full', 'top<k>' / 'top:<k>' or an int k. Raises ValueError."""
+    if value is None:
+        return EXPLAIN_FULL
+    text = str(value).strip().lower()
+    if text == EXPLAIN_FULL:
+        return EXPLAIN_FULL
+    if text == EXPLAIN_NONE:
+        return EXPLAIN_NONE
+
+    if text.startswith('top'):
+        text = text[3:]
+        if text.startswith(':'):
+            text = text[1:]
+    try:
+        k = int(text)
+    except ValueError:
+        raise ValueError(f"explain must be 'none', 'full', 'top<k>' or an integer k, got {value!r}")
+    if k < 0:
+        raise ValueError("explain top-k must not be negative")
+    return k if k > 0 else EXPLAIN_NONE
 
 class LoanPredictor:
-    def __init__(self):
-        self.model = None
-        self.scaler = None
-        self._load_artifacts()
+    def __init__(self, registry=None, cache=None):
+        # Artifacts are loaded on first use by the registry, not at import
+        self.registry = registry or model_registry
+        self.cache = cache or prediction_cache
+
+    @property
+    def model(self):
+        bundle = self.registry.get()
+        return bundle.model if bundle else None
+
+    @property
+    def scaler(self):
+        bundle = self.registry.get()
+        return bundle.scaler if bundle else None
+
+    def _explain(self, bundle, contribution_matrix, explain, n_rows=1):
+        """
+        Build the factors dict for each of `n_rows` rows of a contribution matrix
+        (None per row when not requested or not available).
+        Top-k selection is vectorized over all rows with argpartition.
+        """
+        if explain == EXPLAIN_NONE or contribution_matrix is None:
+            return [None] * n_rows
+
+        rounded = np.round(contribution_matrix, 4)
+        names = bundle.feature_order
+        if explain == EXPLAIN_FULL or explain >= len(names):
+            return [dict(zip(names, row)) for row in rounded.tolist()]
+
+        # k largest |contribution| per row, then ordered by influence
+        magnitude = np.abs(contribution_matrix)
+        top = np.argpartition(-magnitude, explain - 1, axis=1)[:, :explain]
+        order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        values = np.take_along_axis(rounded, top, axis=1).tolist()
+        return [
+            {names[i]: value for i, value in zip(indices, row_values)}
+            for indices, row_values in zip(top.tolist(), values)
+        ]
+
+    def _new_log_entry(self, data, status_result, probability, contributions):
+        return {
+            "uid": uuid.uuid4().hex,
+            "input_features": data,
+            "status": status_result,
+            "probability": probability,
+            "top_factors": contributions,
+            "created_at": datetime.utcnow()
+        }
 
-    def _load_artifacts(self):
+    def _write_log(self, entry, log_mode):
+        """Persist one log entry according to log_mode. Returns its id, or None while queued."""
+        if log_mode == LOG_WRITE_BEHIND and log_writer.submit(entry):
+            return None
+
+        # Inline write (also the fallback when the writer is off or full)
         try:
-            with open(MODEL_PATH, 'rb') as f:
-                self.model = pickle.load(f)
-            with open(SCALER_PATH, 'rb') as f:
-                self.scaler = pickle.load(f)
-            print("ML Artifacts loaded successfully.")
-        except Exception as e:
-            print(f"Error loading ML artifacts: {e}")
-            self.model = None
-            self.scaler = None
+            log_entry = PredictionLog(**entry)
+            db.session.add(log_entry)
+            if log_mode == LOG_SESSION:
+                db.session.flush()
+            else:
+                db.session.commit()
+                print("Prediction logged to DB.")
+            return log_entry.id # Capture ID
+        except Exception as db_e:
+            print(f"Failed to log prediction: {db_e}")
+            db.session.rollback()
+            return None
 
-    def predict(self, data):
+    def predict(self, data, log_mode=LOG_WRITE_BEHIND, explain=EXPLAIN_FULL):
         """
+        log_mode: one of LOG_WRITE_BEHIND (default), LOG_COMMIT, LOG_SESSION.
+        Callers that link the log to another row (e.g. apply_for_loan) should
+        use LOG_SESSION so the log is written in the same commit.
+        explain: EXPLAIN_FULL (default), EXPLAIN_NONE or an int k for the top-k
+        factors. Contributions are only computed when requested.
+
         data: dict containing:
         - no_of_dependents (int)
         - education (str: 'Graduate'/'Not Graduate')
@@ -42,80 +133,147 @@ class LoanPredictor:
         - luxury_assets_value (float)
         - bank_asset_value (float)
         """
-        if not self.model or not self.scaler:
+        # Pin one model version for the whole call
+        bundle = self.registry.get()
+        if bundle is None:
             return {"error": "Model not loaded properly"}
 
         try:
-            # Preprocess Categorical Inputs
-            education_val = 1 if data.get('education') == 'Graduate' else 0
-            self_employed_val = 1 if data.get('self_employed') == 'Yes' else 0
-            
-            # Prepare input array in specific order
-            features = np.array([[
-                float(data.get('no_of_dependents', 0)),
-                education_val,
-                self_employed_val,
-                float(data.get('income_annum', 0)),
-                float(data.get('loan_amount', 0)),
-                float(data.get('loan_term', 0)),
-                float(data.get('cibil_score', 0)),
-                float(data.get('residential_assets_value', 0)),
-                float(data.get('commercial_assets_value', 0)),
-                float(data.get('luxury_assets_value', 0)),
-                float(data.get('bank_asset_value', 0))
-            ]])
-            
-            # Scale input
-            features_scaled = self.scaler.transform(features)
-            
-            # Predict
-            prediction = self.model.predict(features_scaled)[0]
-            probability = self.model.predict_proba(features_scaled)[0][1]
-
-            # Explainability: Calculate contributions
-            # Coeffs shape is (1, n_features) for binary classification
-            features_list = [
-                'no_of_dependents', 'education', 'self_employed', 'income_annum', 
-                'loan_amount', 'loan_term', 'cibil_score', 
-                'residential_assets_value', 'commercial_assets_value', 
-                'luxury_assets_value', 'bank_asset_value'
-            ]
-            
-            contributions = {}
-            if hasattr(self.model, 'coef_'):
-                coefs = self.model.coef_[0]
-                # feature * weight
-                weighted_features = features_scaled[0] * coefs
-                
-                # Zip and sort by absolute influence
-                for name, weight in zip(features_list, weighted_features):
-                    contributions[name] = round(weight, 4)
-                
-            # Log to Database
-            status_result = "Approved" if prediction == 1 else "Rejected"
-            try:
-                log_entry = PredictionLog(
-                    input_features=data,
-                    status=status_result,
-                    probability=round(probability, 2),
-                    top_factors=contributions
-                )
-                db.session.add(log_entry)
-                db.session.commit()
-                print("Prediction logged to DB.")
-                log_id = log_entry.id # Capture ID
-            except Exception as db_e:
-                print(f"Failed to log prediction: {db_e}")
-                db.session.rollback()
-                log_id = None
+            # Prepare input array in the model's feature order
+            features_row = encode_record(data, bundle.feature_order)
+
+            # Same applicant profile + same model version => same answer
+            cache_key = self.cache.make_key(bundle.version, features_row)
+            cached = self.cache.get(cache_key)
+
+            if cached and (cached["contributions"] is not None or explain == EXPLAIN_NONE):
+                status_result = cached["status"]
+                probability = cached["probability"]
+                contribution_matrix = cached["contributions"]
+            else:
+                # Predict (+ Explainability in the same pass, if asked for)
+                features = np.array([features_row], dtype=float)
+                labels, probabilities, contribution_matrix = bundle.score(features, explain != EXPLAIN_NONE)
+                prediction = labels[0]
+                probability = round(float(probabilities[0]), 2)
+                status_result = "Approved" if prediction == 1 else "Rejected"
+
+            contributions = self._explain(bundle, contribution_matrix, explain)[0]
+
+            # Reuse the cached log unless configured otherwise, the caller needs a row id
+            # that the cached (still queued) log doesn't have yet, or the log's stored
+            # factors were written for a different explain mode than this response
+            if (
+                cached and not self.cache.log_hits and cached["log_uid"]
+                and cached["log_explain"] == explain
+                and (cached["log_id"] or log_mode == LOG_WRITE_BEHIND)
+            ):
+                log_id = cached["log_id"]
+                log_uid = cached["log_uid"]
+                cache_log_id, cache_log_uid, cache_log_explain = log_id, log_uid, explain
+            else:
+                # Log to Database
+                entry = self._new_log_entry(data, status_result, probability, contributions)
+                log_id = self._write_log(entry, log_mode)
+                log_uid = entry["uid"]
+                if log_mode == LOG_SESSION:
+                    # The row only exists once the caller commits (never, if it rolls back),
+                    # so it isn't offered to later callers; keep whatever log was cached before
+                    if cached:
+                        cache_log_id, cache_log_uid, cache_log_explain = cached["log_id"], cached["log_uid"], cached["log_explain"]
+                    else:
+                        cache_log_id, cache_log_uid, cache_log_explain = None, None, None
+                else:
+                    cache_log_id, cache_log_uid, cache_log_explain = log_id, log_uid, explain
+
+            # Remember the raw contributions so any explain mode can be served from cache
+            if cached is None:
+                new_log_to_reuse = True
+            else:
+                new_log_to_reuse = not self.cache.log_hits and cache_log_uid != cached["log_uid"]
+            if new_log_to_reuse or (cached["contributions"] is None and contribution_matrix is not None):
+                self.cache.set(cache_key, {
+                    "status": status_result,
+                    "probability": probability,
+                    "contributions": contribution_matrix,
+                    "log_id": cache_log_id,
+                    "log_uid": cache_log_uid,
+                    "log_explain": cache_log_explain
+                })
 
             return {
                 "status": status_result,
-                "probability": round(probability, 2),
+                "probability": probability,
                 "factors": contributions,
-                "log_id": log_id 
+                "log_id": log_id,
+                "log_uid": log_uid,
+                "model_version": bundle.version
             }
         except Exception as e:
             return {"error": str(e)}
 
+    def predict_batch(self, rows, log_mode=LOG_COMMIT, explain=EXPLAIN_FULL):
+        """
+        Score many applications in one pass.
+
+        rows: list of dicts in the same format as predict().
+        log_mode: LOG_COMMIT (default) or LOG_SESSION.
+        explain: same options as predict().
+        Builds a single feature matrix, scores it once and
+        writes every PredictionLog in one bulk insert + commit.
+        Returns a list of results in the same order as `rows`.
+        """
+        # Pin one model version for the whole call
+        bundle = self.registry.get()
+        if bundle is None:
+            return {"error": "Model not loaded properly"}
+
+        if not rows:
+            return []
+
+        try:
+            features = np.array([encode_record(row, bundle.feature_order) for row in rows], dtype=float)
+
+            # One scoring pass gives labels, probabilities and (if asked for) contributions
+            predictions, approve_probs, contribution_matrix = bundle.score(features, explain != EXPLAIN_NONE)
+            all_contributions = self._explain(bundle, contribution_matrix, explain, len(rows))
+            approve_probs = np.round(approve_probs, 2).tolist()
+
+            results = []
+            log_entries = []
+            for i, row in enumerate(rows):
+                status_result = "Approved" if predictions[i] == 1 else "Rejected"
+                probability = approve_probs[i]
+                contributions = all_contributions[i]
+
+                entry = self._new_log_entry(row, status_result, probability, contributions)
+                log_entries.append(PredictionLog(**entry))
+                results.append({
+                    "status": status_result,
+                    "probability": probability,
+                    "factors": contributions,
+                    "log_id": None,
+                    "log_uid": entry["uid"],
+                    "model_version": bundle.version
+                })
+
+            # Log to Database (single bulk write)
+            try:
+                db.session.add_all(log_entries)
+                db.session.flush()
+                # Capture IDs before commit expires the objects
+                log_ids = [log_entry.id for log_entry in log_entries]
+                if log_mode != LOG_SESSION:
+                    db.session.commit()
+                    print(f"{len(log_entries)} predictions logged to DB.")
+                for result, log_id in zip(results, log_ids):
+                    result["log_id"] = log_id
+            except Exception as db_e:
+                print(f"Failed to log batch predictions: {db_e}")
+                db.session.rollback()
+
+            return results
+        except Exception as e:
+            return {"error": str(e)}
+
 predictor = LoanPredictor()
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from datetime import datetime
+from ml.scoring_engine import ScoringEngine
+
+# Set paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.path.join(BASE_DIR, 'artifacts')
+
+# Artifact file names (inside a version directory, or BASE_DIR for the legacy layout)
+MODEL_FILE = 'model.pkl'
+SCALER_FILE = 'scaler.pkl'
+METADATA_FILE = 'metadata.json'
+# Pickle-free, memory-mappable export of linear models (preferred when present)
+LINEAR_FILE = 'model.npy'
+
+# artifacts/CURRENT holds the name of the version directory being served
+CURRENT_FILE = 'CURRENT'
+
+
+class ModelBundle:
+    """One loaded model version. Never mutated after load, so it is safe to share."""
+
+    def __init__(self, version, path, model, scaler, metadata=None, engine=None):
+        self.version = version
+        self.path = path
+        self.model = model
+        self.scaler = scaler
+        self.metadata = metadata or {}
+        self.loaded_at = datetime.utcnow()
+
+        # Compile the fused scorer; other model types use the sklearn path
+        self.engine = engine
+        if self.engine is None and ScoringEngine.supports(model, scaler):
+            self.engine = ScoringEngine.from_sklearn(model, scaler)
+
+        # Feature order comes from the training metadata (or the binary
+        # artifact); legacy pickles only have the column names the scaler was fitted on
+        if 'feature_order' in self.metadata:
+            self.feature_order = list(self.metadata['feature_order'])
+        elif self.engine is not None and self.engine.feature_order:
+            self.feature_order = self.engine.feature_order
+        elif hasattr(scaler, 'feature_names_in_'):
+            self.feature_order = [str(name) for name in scaler.feature_names_in_]
+        else:
+            raise ValueError(f"Model version {version} has no feature order (missing {METADATA_FILE})")
+
+    def score(self, features, contributions=True):
+        """
+        Score a raw feature matrix.
+        Returns (labels, probabilities, contributions); contributions is None
+        when not requested or the model has no linear weights to explain with.
+        """
+        if self.engine is not None:
+            return self.engine.score(features, contributions)
+
+        # Fallback: plain sklearn path
+        features_scaled = self.scaler.transform(features)
+        probabilities = self.model.predict_proba(features_scaled)
+        labels = self.model.classes_[probabilities.argmax(axis=1)]
+
+        contribution_matrix = None
+        if contributions and hasattr(self.model, 'coef_'):
+            # Coeffs shape is (1, n_features) for binary classification
+            contribution_matrix = features_scaled * self.model.coef_[0]
+        return labels, probabilities[:, 1], contribution_matrix
+
+
+class ModelRegistry:
+    """
+    Lazily loads the active model version and hot-swaps it when it changes.
+
+    Layouts, in order of preference:
+    1. artifacts/CURRENT names a directory artifacts/<version>/ with model.pkl + scaler.pkl
+    2. legacy model.pkl + scaler.pkl next to this file
+
+    In either directory, a model.npy export is memory-mapped instead of
+    unpickling anything; the pickles are only read when it is absent.
+
+    Nothing is loaded until the first get(). After that, at most once every
+    `reload_interval` seconds, get() stats the active files and loads a new
+    bundle if they changed. The swap is a single reference assignment, so
+    in-flight requests finish on the bundle they started with. A failed load
+    keeps serving the previous bundle and is reported by status().
+    """
+
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR, legacy_dir=BASE_DIR, reload_interval=5.0):
+        self.artifacts_dir = artifacts_dir
+        self.legacy_dir = legacy_dir
+        self.reload_interval = reload_interval
+        self.last_error = None
+        self._bundle = None
+        self._stamp = None
+        self._last_check = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.reload_interval = app.config.get('ML_MODEL_RELOAD_INTERVAL', self.reload_interval)
+
+    def get(self):
+        """Return the serving ModelBundle, or None if no model could be loaded."""
+        if not self._check_due():
+            return self._bundle
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            if self._check_due():
+                self._refresh()
+        return self._bundle
+
+    def _check_due(self):
+        return self._last_check is None or time.monotonic() - self._last_check >= self.reload_interval
+
+    def resolve(self):
+        """Return (version, directory) of the active artifacts; version is None for the legacy layout."""
+        current_path = os.path.join(self.artifacts_dir, CURRENT_FILE)
+        if os.path.exists(current_path):
+            with open(current_path) as f:
+                version = f.read().strip()
+            return version, os.path.join(self.artifacts_dir, version)
+        return None, self.legacy_dir
+
+    def _refresh(self):
+        self._last_check = time.monotonic()
+        try:
+            version, directory = self.resolve()
+            linear_path = os.path.join(directory, LINEAR_FILE)
+            if os.path.exists(linear_path):
+                paths = [linear_path]
+            else:
+                # Legacy fallback: pickled sklearn objects
+                paths = [os.path.join(directory, MODEL_FILE), os.path.join(directory, SCALER_FILE)]
+
+            stamp = (version,) + tuple((path, os.path.getmtime(path)) for path in paths)
+            if stamp == self._stamp:
+                return
+
+            metadata = None
+            metadata_path = os.path.join(directory, METADATA_FILE)
+            if os.path.exists(metadata_path):
+                with open(metadata_path) as f:
+                    metadata = json.load(f)
+
+            if version is None:
+                digest = hashlib.sha256()
+                for path in paths:
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+                version = "legacy-" + digest.hexdigest()[:12]
+
+            if paths[0] == linear_path:
+                bundle = ModelBundle(version, directory, None, None, metadata, engine=ScoringEngine.load(linear_path))
+            else:
+                with open(paths[0], 'rb') as f:
+                    model = pickle.load(f)
+                with open(paths[1], 'rb') as f:
+                    scaler = pickle.load(f)
+                bundle = ModelBundle(version, directory, model, scaler, metadata)
+
+            # Atomic swap
+            self._bundle = bundle
+            self._stamp = stamp
+            self.last_error = None
+            print(f"ML Artifacts loaded successfully (version {version}).")
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Error loading ML artifacts: {e}")
+
+    def status(self):
+        """Readiness probe: which version is serving, and the last load error if any."""
+        bundle = self.get()
+        return {
+            "ready": bundle is not None,
+            "version": bundle.version if bundle else None,
+            "loaded_at": bundle.loaded_at.isoformat() if bundle else None,
+            "metrics": bundle.metadata.get('metrics') if bundle else None,
+            "error": self.last_error
+        }
+
+
+def publish_artifacts(model, scaler, metadata, version=None, artifacts_dir=ARTIFACTS_DIR):
+    """
+    Write a new model version (model, scaler, metadata.json, plus model.npy
+    for linear models) and make it the active one.
+
+    The version directory is fully written before it is renamed into place,
+    and CURRENT is replaced atomically, so a running registry never sees a
+    half-written version. Returns the version name.
+    """
+    version = version or datetime.utcnow().strftime('v%Y%m%d%H%M%S')
+    os.makedirs(artifacts_dir, exist_ok=True)
+
+    final_dir = os.path.join(artifacts_dir, version)
+    if os.path.exists(final_dir):
+        raise FileExistsError(f"Model version {version} already exists")
+
+    tmp_dir = os.path.join(artifacts_dir, f".tmp-{version}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    with open(os.path.join(tmp_dir, MODEL_FILE), 'wb') as f:
+        pickle.dump(model, f)
+    with open(os.path.join(tmp_dir, SCALER_FILE), 'wb') as f:
+        pickle.dump(scaler, f)
+    if ScoringEngine.supports(model, scaler):
+        ScoringEngine.export_artifact(model, scaler, metadata['feature_order'], os.path.join(tmp_dir, LINEAR_FILE))
+    with open(os.path.join(tmp_dir, METADATA_FILE), 'w') as f:
+        json.dump(dict(metadata, version=version), f, indent=2)
+    os.rename(tmp_dir, final_dir)
+
+    # Point CURRENT at the new version
+    tmp_current = os.path.join(artifacts_dir, f".{CURRENT_FILE}.tmp")
+    with open(tmp_current, 'w') as f:
+        f.write(version)
+    os.replace(tmp_current, os.path.join(artifacts_dir, CURRENT_FILE))
+
+    return version
+
+
+def export_linear_artifact(directory):
+    """
+    Write model.npy next to existing pickles (e.g. the legacy ml/model.pkl),
+    so the registry memory-maps it instead of unpickling. Returns its path.
+    """
+    with open(os.path.join(directory, MODEL_FILE), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(directory, SCALER_FILE), 'rb') as f:
+        scaler = pickle.load(f)
+    if not ScoringEngine.supports(model, scaler):
+        raise ValueError("Only binary linear models can be exported to model.npy")
+
+    metadata = {}
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    feature_order = ModelBundle(None, directory, model, scaler, metadata).feature_order
+
+    path = os.path.join(directory, LINEAR_FILE)
+    ScoringEngine.export_artifact(model, scaler, feature_order, path)
+    return path
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,142 @@
+# Run from backend/: python -m ml.score_dataset <input.csv> <output.csv|output.parquet>
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from ml.registry import ModelRegistry
+from ml.features import encode_frame
+
+# Set paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BASE_DIR, '../../ml/loan_approval_dataset.csv')
+
+# Model bundle loaded once per worker process
+_bundle = None
+
+
+def _init_worker():
+    global _bundle
+    _bundle = ModelRegistry().get()
+    if _bundle is None:
+        raise RuntimeError("Model not loaded properly")
+
+
+def score_chunk(df, id_column):
+    """Score one chunk; returns a DataFrame with status, probability and contributions per row."""
+    labels, probabilities, contributions = _bundle.score(encode_frame(df, _bundle.feature_order))
+
+    result = pd.DataFrame(index=df.index)
+    if id_column and id_column in df.columns:
+        result[id_column] = df[id_column].to_numpy()
+    result['status'] = ['Approved' if label == 1 else 'Rejected' for label in labels]
+    result['probability'] = probabilities.round(4)
+    if contributions is not None:
+        for i, name in enumerate(_bundle.feature_order):
+            result[f'contrib_{name}'] = contributions[:, i].round(4)
+    result['model_version'] = _bundle.version
+    return result
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.header_written = False
+        self.file = open(path, 'w', newline='')
+
+    def write(self, df):
+        df.to_csv(self.file, header=not self.header_written, index=False)
+        self.header_written = True
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path, fmt=None):
+    fmt = fmt or ('parquet' if path.endswith('.parquet') else 'csv')
+    return ParquetSink(path) if fmt == 'parquet' else CsvSink(path)
+
+
+def score_file(input_path, output_path, fmt=None, chunk_size=10000, workers=None, id_column='loan_id'):
+    """
+    Score a CSV laid out like ml/loan_approval_dataset.csv.
+
+    Chunks are read lazily, scored on a process pool and written in input
+    order as they complete. At most 2 chunks per worker are in flight, so
+    memory stays flat regardless of file size. Returns the number of rows scored.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    chunks = pd.read_csv(input_path, chunksize=chunk_size, skipinitialspace=True)
+    sink = open_sink(output_path, fmt)
+    rows = 0
+
+    try:
+        if workers == 0:
+            # Inline mode, handy for small files and debugging
+            _init_worker()
+            for chunk in chunks:
+                result = score_chunk(chunk, id_column)
+                sink.write(result)
+                rows += len(result)
+            return rows
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(executor.submit(score_chunk, chunk, id_column))
+                if len(in_flight) >= workers * 2:
+                    result = in_flight.popleft().result()
+                    sink.write(result)
+                    rows += len(result)
+
+            while in_flight:
+                result = in_flight.popleft().result()
+                sink.write(result)
+                rows += len(result)
+        return rows
+    finally:
+        sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score a loan dataset with the active model.")
+    parser.add_argument('input', nargs='?', default=DATASET_PATH, help="Input CSV (default: the training dataset)")
+    parser.add_argument('output', help="Output .csv or .parquet file")
+    parser.add_argument('--format', choices=['csv', 'parquet'], help="Output format (default: from the file extension)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Rows per chunk (default: 10000)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes, 0 to score inline (default: CPU count)")
+    parser.add_argument('--id-column', default='loan_id', help="Input column copied to the output (default: loan_id)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = score_file(args.input, args.output, args.format, args.chunk_size, args.workers, args.id_column)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} rows in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+from scipy.special import expit
+
+# Longest feature name the binary artifact can hold
+MAX_FEATURE_NAME = 64
+
+
+def _artifact_dtype(n_features):
+    """One fixed-layout record: everything the engine needs, nothing pickled."""
+    return np.dtype([
+        ('feature_order', f'U{MAX_FEATURE_NAME}', (n_features,)),
+        ('weights', '<f8', (n_features,)),   # coef / scale (folded)
+        ('offsets', '<f8', (n_features,)),   # coef * mean / scale (folded)
+        ('coef', '<f8', (n_features,)),      # raw model coefficients
+        ('mean', '<f8', (n_features,)),      # scaler statistics
+        ('scale', '<f8', (n_features,)),
+        ('intercept', '<f8'),
+        ('classes', '<i8', (2,)),
+    ])
+
+
+class ScoringEngine:
+    """
+    Compiled scorer for a StandardScaler + binary LogisticRegression pair.
+
+    The scaler is folded into the model at build time:
+        coef . (x - mean) / scale + b  ==  x . (coef / scale) - coef . mean / scale + b
+    so scoring is a single multiply/sum over the raw feature matrix, with no
+    sklearn input validation on the hot path. The per-feature terms of that
+    sum are exactly the contributions reported to the user.
+    """
+
+    def __init__(self, weights, offsets, intercept, classes=(0, 1), coef=None, feature_order=None):
+        # asarray keeps memory-mapped inputs as views, nothing is copied
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        self.coef = coef
+        self.feature_order = feature_order
+
+    @staticmethod
+    def supports(model, scaler):
+        """True if the pair can be folded (binary linear model + standard scaling)."""
+        coef = getattr(model, 'coef_', None)
+        return (
+            coef is not None
+            and coef.shape[0] == 1
+            and len(getattr(model, 'classes_', [])) == 2
+            and hasattr(scaler, 'mean_')
+            and hasattr(scaler, 'scale_')
+        )
+
+    @classmethod
+    def from_sklearn(cls, model, scaler):
+        coef = np.asarray(model.coef_[0], dtype=np.float64)
+        n_features = coef.shape[0]
+
+        # with_mean=False / with_std=False leave these as None
+        mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+
+        weights = coef / scale
+        offsets = weights * mean
+        return cls(weights, offsets, model.intercept_[0], model.classes_, coef)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-map a binary artifact written by export_artifact() read-only.
+        Every worker on the node maps the same file, so they share its pages
+        through the OS page cache instead of each holding unpickled copies.
+        """
+        mapped = np.load(path, mmap_mode='r')
+        # Index fields before the record, so arrays stay views into the mapping
+        return cls(
+            mapped['weights'][0], mapped['offsets'][0], mapped['intercept'][0], mapped['classes'][0],
+            coef=mapped['coef'][0], feature_order=[str(name) for name in mapped['feature_order'][0]]
+        )
+
+    @staticmethod
+    def export_artifact(model, scaler, feature_order, path):
+        """Write the coefficients, intercept and scaler statistics to a pickle-free .npy file."""
+        engine = ScoringEngine.from_sklearn(model, scaler)
+        n_features = engine.weights.shape[0]
+        if len(feature_order) != n_features:
+            raise ValueError("feature_order does not match the model's number of features")
+        if max(len(name) for name in feature_order) > MAX_FEATURE_NAME:
+            raise ValueError(f"Feature names must be at most {MAX_FEATURE_NAME} characters")
+
+        record = np.zeros(1, dtype=_artifact_dtype(n_features))
+        record['feature_order'] = feature_order
+        record['weights'] = engine.weights
+        record['offsets'] = engine.offsets
+        record['coef'] = engine.coef
+        record['mean'] = scaler.mean_ if scaler.mean_ is not None else 0.0
+        record['scale'] = scaler.scale_ if scaler.scale_ is not None else 1.0
+        record['intercept'] = engine.intercept
+        record['classes'] = engine.classes
+
+        # Write then rename, so a mapped file is never rewritten in place
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, record)
+        os.replace(tmp_path, path)
+
+    def score(self, features, contributions=True):
+        """
+        features: raw (unscaled) matrix of shape (n_rows, n_features).
+        Returns (labels, probabilities, contributions) where probabilities is
+        P(class 1) per row and contributions has the same shape as features,
+        or is None when not requested (then scoring is a single dot product).
+        """
+        if contributions:
+            contribution_matrix = features * self.weights - self.offsets
+            logits = contribution_matrix.sum(axis=1) + self.intercept
+        else:
+            contribution_matrix = None
+            logits = features @ self.weights + (self.intercept - self.offsets.sum())
+
+        probabilities = expit(logits)
+        labels = self.classes[(logits > 0).astype(np.intp)]
+        return labels, probabilities, contribution_matrix
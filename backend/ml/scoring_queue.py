@@ -0,0 +1,162 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.orm import joinedload
+from extensions import db
+from ml.predictor import predictor, LOG_SESSION
+from models.scoring_job import (
+    ScoringJob, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, SCORING_PENDING, SCORING_DONE, SCORING_FAILED
+)
+
+# Number of factors stored on the prediction log for loan applications
+APPLY_EXPLAIN_TOP_K = 5
+
+
+def enqueue_scoring(loan, payload):
+    """Queue `loan` for scoring with predictor input `payload`. Caller adds the loan and commits."""
+    loan.scoring_status = SCORING_PENDING
+    db.session.add(ScoringJob(loan=loan, payload=payload))
+
+
+class ScoringWorker:
+    """
+    Scores queued loan applications in batches (`flask score-loans`).
+
+    The queue is the scoring_jobs table, so any number of workers can run
+    against SQLite or Postgres without a broker. Each batch goes through one
+    predict_batch call; its prediction logs and the loan updates are written
+    in one commit. A failed batch is retried job by job so one bad application
+    can't hold up the rest, and failed jobs back off exponentially until
+    `max_attempts`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.batch_size = app.config.get('SCORING_BATCH_SIZE', 50)
+        self.poll_interval = app.config.get('SCORING_POLL_INTERVAL', 1.0)
+        self.max_attempts = app.config.get('SCORING_MAX_ATTEMPTS', 5)
+        self.retry_delay = app.config.get('SCORING_RETRY_DELAY', 30.0)
+        self.lock_timeout = app.config.get('SCORING_LOCK_TIMEOUT', 300.0)
+
+    def claim(self):
+        """Claim up to batch_size due jobs for this worker. Returns them with their loans loaded."""
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(ScoringJob.status == JOB_QUEUED, ScoringJob.run_after <= now),
+            # Claimed by a worker that died mid-batch
+            and_(ScoringJob.status == JOB_RUNNING, ScoringJob.locked_at < now - timedelta(seconds=self.lock_timeout))
+        )
+
+        # 1. Oldest due jobs (on Postgres, rows another worker is claiming right now are skipped)
+        ids = db.session.scalars(
+            select(ScoringJob.id).where(claimable).order_by(ScoringJob.id).limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            db.session.rollback()
+            return []
+
+        # 2. Stamp them with a token for this claim; repeating the condition leaves
+        #    jobs that another worker claimed in the meantime alone
+        token = uuid.uuid4().hex
+        db.session.execute(
+            update(ScoringJob).where(ScoringJob.id.in_(ids), claimable).values(
+                status=JOB_RUNNING, claim_token=token, locked_at=now, attempts=ScoringJob.attempts + 1
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return ScoringJob.query.options(joinedload(ScoringJob.loan)).filter_by(claim_token=token).order_by(ScoringJob.id).all()
+
+    def _score(self, jobs):
+        """Score `jobs` in one pass and commit the results. Returns an error message, or None."""
+        results = predictor.predict_batch([job.payload for job in jobs], log_mode=LOG_SESSION, explain=APPLY_EXPLAIN_TOP_K)
+        if isinstance(results, dict):
+            return results.get("error") or "Scoring failed"
+        if any(not result["log_id"] for result in results):
+            # predict_batch rolled back when the log insert failed
+            return "Failed to write prediction logs"
+
+        now = datetime.utcnow()
+        for job, result in zip(jobs, results):
+            loan = job.loan
+            loan.prediction_log_id = result["log_id"]
+            loan.risk_category = result["status"]
+            loan.ai_confidence_score = result["probability"]
+            loan.scoring_status = SCORING_DONE
+            job.status = JOB_DONE
+            job.finished_at = now
+            job.last_error = None
+        db.session.commit()
+        return None
+
+    def _fail(self, jobs, error):
+        """Schedule a retry with exponential backoff, or give up after max_attempts."""
+        now = datetime.utcnow()
+        for job in jobs:
+            job.last_error = str(error)[:1000]
+            if job.attempts >= self.max_attempts:
+                job.status = JOB_FAILED
+                job.finished_at = now
+                job.loan.scoring_status = SCORING_FAILED
+            else:
+                job.status = JOB_QUEUED
+                job.run_after = now + timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+        db.session.commit()
+        print(f"Scoring failed for loans {[job.loan_id for job in jobs]}: {error}")
+
+    def process(self, jobs):
+        """Score a claimed batch. Returns the number of loans scored."""
+        error = self._score(jobs)
+        if error is None:
+            return len(jobs)
+
+        db.session.rollback()
+        if len(jobs) == 1:
+            self._fail(jobs, error)
+            return 0
+
+        # One bad application should not take the rest of the batch with it
+        scored = 0
+        for job in jobs:
+            job_error = self._score([job])
+            if job_error is None:
+                scored += 1
+            else:
+                db.session.rollback()
+                self._fail([job], job_error)
+        return scored
+
+    def run_once(self):
+        """Claim and process one batch. Returns the number of jobs claimed."""
+        with self.app.app_context():
+            try:
+                jobs = self.claim()
+                if not jobs:
+                    return 0
+                try:
+                    scored = self.process(jobs)
+                except Exception as e:
+                    db.session.rollback()
+                    self._fail(jobs, e)
+                    scored = 0
+                print(f"Scored {scored} of {len(jobs)} loan applications.")
+                return len(jobs)
+            finally:
+                db.session.remove()
+
+    def run(self, once=False):
+        """Process batches until stopped; with once=True, return when the queue is empty."""
+        print(f"Scoring worker started (batch size {self.batch_size})")
+        while True:
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                # e.g. database unreachable: keep polling
+                print(f"Scoring worker error: {e}")
+                claimed = 0
+            if claimed == 0:
+                if once:
+                    return
+                time.sleep(self.poll_interval)
@@ -1,99 +1,223 @@
-import pandas as pd
-import pickle
+# Run from backend/: python -m ml.train_model
+import argparse
+import hashlib
 import os
-from sklearn.model_selection import train_test_split
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.metrics import accuracy_score
+from ml.features import encode_frame
+from ml.registry import ModelBundle, ModelRegistry, publish_artifacts, export_linear_artifact
 
 # Set paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATASET_PATH = os.path.join(BASE_DIR, '../../ml/loan_approval_dataset.csv')
-MODEL_PATH = os.path.join(BASE_DIR, 'model.pkl')
-SCALER_PATH = os.path.join(BASE_DIR, 'scaler.pkl')
 
-def train():
-    print("Loading dataset...")
-    if not os.path.exists(DATASET_PATH):
-        print(f"Error: Dataset not found at {DATASET_PATH}")
-        return
+# Define Feature Columns in Specific Order.
+# This is the only place the order is defined: it is saved to metadata.json
+# and read back from there by the predictor, the bulk scorer and inspect_model.
+FEATURE_ORDER = [
+    'no_of_dependents', 'education', 'self_employed', 'income_annum', 
+    'loan_amount', 'loan_term', 'cibil_score', 
+    'residential_assets_value', 'commercial_assets_value', 
+    'luxury_assets_value', 'bank_asset_value'
+]
 
+# Model families and the hyperparameter grid searched for each
+MODEL_FAMILIES = {
+    'logistic': (LogisticRegression, [
+        {'C': c, 'max_iter': 1000} for c in (0.01, 0.1, 1.0, 10.0, 100.0)
+    ]),
+    'random_forest': (RandomForestClassifier, [
+        {'n_estimators': n, 'max_depth': d, 'random_state': 0} for n in (100, 300) for d in (None, 10)
+    ]),
+    'gradient_boosting': (GradientBoostingClassifier, [
+        {'n_estimators': n, 'learning_rate': lr, 'random_state': 0} for n in (100, 200) for lr in (0.05, 0.1)
+    ]),
+}
+
+# Rows timed for the latency report
+LATENCY_ROWS = 200
+
+
+def load_dataset():
     df = pd.read_csv(DATASET_PATH)
-    
-    # Clean column names (remove leading/trailing spaces)
-    df.columns = df.columns.str.strip()
 
-    # Features to use:
-    # 1. no_of_dependents
-    # 2. education (Categorical)
-    # 3. self_employed (Categorical)
-    # 4. income_annum
-    # 5. loan_amount
-    # 6. loan_term
-    # 7. cibil_score
-    # 8. residential_assets_value
-    # 9. commercial_assets_value
-    # 10. luxury_assets_value
-    # 11. bank_asset_value
-    
-    # Clean categorical data (remove potential spaces)
-    df['education'] = df['education'].str.strip()
-    df['self_employed'] = df['self_employed'].str.strip()
-    df['loan_status'] = df['loan_status'].str.strip()
-
-    # Encoding Categorical Features
-    # Education: Graduate -> 1, Not Graduate -> 0
-    df['education'] = df['education'].map({'Graduate': 1, 'Not Graduate': 0})
-    
-    # Self Employed: Yes -> 1, No -> 0
-    df['self_employed'] = df['self_employed'].map({'Yes': 1, 'No': 0})
-    
     # Loan Status: Approved -> 1, Rejected -> 0
-    df['loan_status'] = df['loan_status'].map({'Approved': 1, 'Rejected': 0})
+    df.columns = df.columns.str.strip()
+    y = (df['loan_status'].str.strip() == 'Approved').astype(int).to_numpy()
+
+    # Categorical features are encoded the same way the predictor does it
+    X = encode_frame(df, FEATURE_ORDER)
+    return X, y
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def evaluate_candidate(family, params, X_train, y_train, folds):
+    """
+    K-fold cross-validate one candidate, then fit it on the whole training split.
+    Runs in a worker process. The scaler is fitted inside each fold, so the
+    validation fold never leaks into the scaling statistics.
+    """
+    estimator_cls = MODEL_FAMILIES[family][0]
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+
+    scores = []
+    for train_idx, val_idx in splitter.split(X_train, y_train):
+        scaler = StandardScaler().fit(X_train[train_idx])
+        model = estimator_cls(**params).fit(scaler.transform(X_train[train_idx]), y_train[train_idx])
+        scores.append(accuracy_score(y_train[val_idx], model.predict(scaler.transform(X_train[val_idx]))))
+
+    scaler = StandardScaler().fit(X_train)
+    model = estimator_cls(**params).fit(scaler.transform(X_train), y_train)
+
+    return {
+        "family": family,
+        "params": params,
+        "cv_accuracy_mean": float(np.mean(scores)),
+        "cv_accuracy_std": float(np.std(scores)),
+        "model": model,
+        "scaler": scaler
+    }
+
+
+def measure_latency(model, scaler, X):
+    """Per-row latency of the serving path (ModelBundle.score), single-row and batched, in microseconds."""
+    bundle = ModelBundle("candidate", None, model, scaler, {"feature_order": FEATURE_ORDER})
+    rows = X[:LATENCY_ROWS]
 
-    # Define Feature Columns in Specific Order
-    feature_cols = [
-        'no_of_dependents', 'education', 'self_employed', 'income_annum', 
-        'loan_amount', 'loan_term', 'cibil_score', 
-        'residential_assets_value', 'commercial_assets_value', 
-        'luxury_assets_value', 'bank_asset_value'
-    ]
+    start = time.perf_counter()
+    for i in range(len(rows)):
+        bundle.score(rows[i:i + 1])
+    single_us = (time.perf_counter() - start) / len(rows) * 1e6
 
-    X = df[feature_cols]
-    y = df['loan_status']
+    start = time.perf_counter()
+    bundle.score(rows)
+    batch_us = (time.perf_counter() - start) / len(rows) * 1e6
 
-    # Handle any potential remaining NaNs (though analysis showed none, good practice)
-    X = X.fillna(0) # Simple strategy
+    return round(single_us, 2), round(batch_us, 2)
 
-    # Split data
+
+def train(families=None, folds=5, workers=None, allow_opaque=False, dry_run=False):
+    print("Loading dataset...")
+    if not os.path.exists(DATASET_PATH):
+        print(f"Error: Dataset not found at {DATASET_PATH}")
+        return
+
+    X, y = load_dataset()
+
+    # Split data (the test split is held out for the final report only)
     print("Splitting data...")
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.25, random_state=0)
 
-    # Scale features
-    print("Scaling features...")
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    # Search every candidate in parallel
+    families = families or list(MODEL_FAMILIES)
+    candidates = [(family, params) for family in families for params in MODEL_FAMILIES[family][1]]
+    print(f"Cross-validating {len(candidates)} candidates ({folds}-fold) on a process pool...")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(evaluate_candidate, family, params, X_train, y_train, folds)
+            for family, params in candidates
+        ]
+        results = [future.result() for future in futures]
+
+    # Latency is measured afterwards, one candidate at a time, so the pool doesn't skew it
+    for result in results:
+        result["latency_single_us"], result["latency_batch_us_per_row"] = measure_latency(
+            result["model"], result["scaler"], X_test
+        )
 
-    # Train model
-    print("Training Logistic Regression model...")
-    model = LogisticRegression()
-    model.fit(X_train_scaled, y_train)
+    print(f"\n{'family':<18} {'params':<50} {'cv acc':>14} {'1-row us':>9} {'batch us':>9}")
+    for result in sorted(results, key=lambda r: r["cv_accuracy_mean"], reverse=True):
+        params = {k: v for k, v in result["params"].items() if k != 'random_state'}
+        print(f"{result['family']:<18} {str(params):<50} "
+              f"{result['cv_accuracy_mean']:.4f}±{result['cv_accuracy_std']:.4f} "
+              f"{result['latency_single_us']:>9} {result['latency_batch_us_per_row']:>9}")
+
+    # Pick the winner: best CV accuracy, then lowest latency. Only models with
+    # linear weights can explain their predictions unless opaque ones are allowed.
+    eligible = [r for r in results if allow_opaque or hasattr(r["model"], 'coef_')]
+    if not eligible:
+        print("Error: No eligible candidates (use --allow-opaque to consider tree models)")
+        return
+    best = max(eligible, key=lambda r: (round(r["cv_accuracy_mean"], 4), -r["latency_single_us"]))
 
     # Evaluate
-    y_pred = model.predict(X_test_scaled)
-    accuracy = accuracy_score(y_test, y_pred)
-    print(f"Model trained. Accuracy: {accuracy:.2f}")
+    holdout_accuracy = accuracy_score(y_test, best["model"].predict(best["scaler"].transform(X_test)))
+    print(f"\nSelected {best['family']} {best['params']}. Holdout accuracy: {holdout_accuracy:.4f}")
+
+    metadata = {
+        "created_at": datetime.utcnow().isoformat(),
+        "feature_order": FEATURE_ORDER,
+        "training_data": os.path.basename(DATASET_PATH),
+        "training_data_sha256": file_sha256(DATASET_PATH),
+        "model_family": best["family"],
+        "params": best["params"],
+        "sklearn_version": sklearn.__version__,
+        "metrics": {
+            "cv_folds": folds,
+            "cv_accuracy_mean": best["cv_accuracy_mean"],
+            "cv_accuracy_std": best["cv_accuracy_std"],
+            "holdout_accuracy": float(holdout_accuracy),
+            "latency_single_us": best["latency_single_us"],
+            "latency_batch_us_per_row": best["latency_batch_us_per_row"]
+        },
+        "candidates": [
+            {k: v for k, v in r.items() if k not in ("model", "scaler")} for r in results
+        ]
+    }
+
+    if dry_run:
+        print("Dry run: nothing published.")
+        return metadata
+
+    # Save artifacts as a new version (plus the model.npy export for linear
+    # models); running servers pick it up without a restart
+    print("Publishing model, scaler and metadata...")
+    version = publish_artifacts(best["model"], best["scaler"], metadata)
+
+    print(f"Done! Serving version: {version}")
+    return metadata
+
+
+def export_only():
+    """Export the active version's pickles to the memory-mappable model.npy format."""
+    version, directory = ModelRegistry().resolve()
+    path = export_linear_artifact(directory)
+    print(f"Exported {version or 'legacy'} artifacts to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search, train and publish a loan approval model.")
+    parser.add_argument('--families', nargs='+', choices=list(MODEL_FAMILIES), help="Model families to search (default: all)")
+    parser.add_argument('--folds', type=int, default=5, help="Cross-validation folds (default: 5)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--allow-opaque', action='store_true', help="Allow selecting models without per-feature explanations")
+    parser.add_argument('--dry-run', action='store_true', help="Report candidates without publishing a new version")
+    parser.add_argument('--export-only', action='store_true', help="Only export the active version's pickles to model.npy")
+    args = parser.parse_args()
+
+    if args.export_only:
+        export_only()
+        return
 
-    # Save artifacts
-    print("Saving model and scaler...")
-    with open(MODEL_PATH, 'wb') as f:
-        pickle.dump(model, f)
-    
-    with open(SCALER_PATH, 'wb') as f:
-        pickle.dump(scaler, f)
+    train(args.families, args.folds, args.workers, args.allow_opaque, args.dry_run)
 
-    print("Done!")
 
 if __name__ == "__main__":
-    train()
+    main()
@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Document(db.Model):
     __tablename__ = "documents"
+    __table_args__ = (
+        db.Index("ix_documents_loan_id", "loan_id"),
+        db.Index("ix_documents_sha256", "sha256"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     loan_id = db.Column(db.Integer, db.ForeignKey("loan_applications.id"), nullable=False)
@@ -10,6 +14,8 @@ class Document(db.Model):
     file_name = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     file_type = db.Column(db.String(50)) # e.g., 'pdf', 'jpg'
+    # Content address in the document store; NULL for files uploaded before it existed
+    sha256 = db.Column(db.String(64), db.ForeignKey("stored_blobs.sha256", name="fk_documents_sha256_stored_blobs"), nullable=True)
 
     verified_status = db.Column(db.String(20), default="pending")   # pending, verified, rejected
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -4,6 +4,14 @@ from models.prediction_log import PredictionLog
 
 class LoanApplication(db.Model):
     __tablename__ = "loan_applications"
+    __table_args__ = (
+        # my-loans: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        db.Index("ix_loan_applications_user_id_created_at", "user_id", "created_at", "id"),
+        # admin list + keyset cursor: ORDER BY created_at DESC, id DESC
+        db.Index("ix_loan_applications_created_at", "created_at", "id"),
+        # status filters, newest first
+        db.Index("ix_loan_applications_status_created_at", "status", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -16,8 +24,15 @@ class LoanApplication(db.Model):
     status = db.Column(db.String(20), default="pending") 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Repayment schedule, fixed at approval (see utils/repayment_schedule.py). NULL = not generated yet.
+    schedule_mode = db.Column(db.String(20), nullable=True)
+    schedule_start = db.Column(db.Date, nullable=True)
+    emi_amount = db.Column(db.Float, nullable=True)
+
     risk_category = db.Column(db.String(20), nullable=True)
     ai_confidence_score = db.Column(db.Float, nullable=True)
+    # pending / scored / failed while the scoring queue (models/scoring_job.py) works on it; NULL = scored inline
+    scoring_status = db.Column(db.String(20), nullable=True)
     
     # Link to deep ML log
     prediction_log_id = db.Column(db.Integer, db.ForeignKey('prediction_logs.id'), nullable=True)
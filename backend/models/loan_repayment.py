@@ -3,6 +3,10 @@ from datetime import datetime
 
 class LoanRepayment(db.Model):
     __tablename__ = "loan_repayments"
+    __table_args__ = (
+        # schedules: WHERE loan_id = ? ORDER BY month_number
+        db.Index("ix_loan_repayments_loan_id_month_number", "loan_id", "month_number"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     loan_id = db.Column(db.Integer, db.ForeignKey("loan_applications.id"), nullable=False)
@@ -4,8 +4,14 @@ from sqlalchemy.dialects.postgresql import JSON  # If using Postgres, otherwise
 
 class PredictionLog(db.Model):
     __tablename__ = "prediction_logs"
+    __table_args__ = (
+        # recent activity: ORDER BY created_at DESC LIMIT n
+        db.Index("ix_prediction_logs_created_at", "created_at"),
+        db.Index("ix_prediction_logs_status_created_at", "status", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    uid = db.Column(db.String(32), unique=True, index=True, nullable=True) # Assigned at predict time, before the row is written
     input_features = db.Column(db.JSON, nullable=False)  # Stores the raw input data
     status = db.Column(db.String(20), nullable=False) # Approved/Rejected
     probability = db.Column(db.Float, nullable=False)
@@ -16,6 +22,7 @@ class PredictionLog(db.Model):
     def to_dict(self):
         return {
             "id": self.id,
+            "uid": self.uid,
             "input_features": self.input_features,
             "status": self.status,
             "probability": self.probability,
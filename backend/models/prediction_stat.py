@@ -0,0 +1,109 @@
+from extensions import db
+from datetime import datetime
+from sqlalchemy import event, func, case, update
+from sqlalchemy.orm import Session
+from models.prediction_log import PredictionLog
+
+# Confidence buckets shown on the admin dashboard
+BUCKET_HIGH = "high"      # probability > 0.8
+BUCKET_MEDIUM = "medium"  # 0.5 < probability <= 0.8
+BUCKET_LOW = "low"        # probability <= 0.5
+
+BUCKET_LABELS = {
+    BUCKET_HIGH: "High (>80%)",
+    BUCKET_MEDIUM: "Medium (50-80%)",
+    BUCKET_LOW: "Low (<50%)"
+}
+
+
+def confidence_bucket(probability):
+    if probability > 0.8:
+        return BUCKET_HIGH
+    if probability > 0.5:
+        return BUCKET_MEDIUM
+    return BUCKET_LOW
+
+
+def confidence_bucket_expr(column):
+    """SQL CASE equivalent of confidence_bucket()."""
+    return case(
+        (column > 0.8, BUCKET_HIGH),
+        (column > 0.5, BUCKET_MEDIUM),
+        else_=BUCKET_LOW
+    )
+
+
+class PredictionStat(db.Model):
+    """
+    Rollup of prediction_logs: number of predictions per day, status and
+    confidence bucket. Kept up to date in the same transaction that writes
+    the logs, so dashboard stats never have to scan prediction_logs.
+    """
+    __tablename__ = "prediction_stats"
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    bucket = db.Column(db.String(10), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+def _upsert_counts(connection, counts):
+    table = PredictionStat.__table__
+    dialect = connection.dialect.name
+
+    for (day, status, bucket), n in counts.items():
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table).values(day=day, status=status, bucket=bucket, count=n)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.day, table.c.status, table.c.bucket],
+                set_={"count": table.c.count + n}
+            )
+            connection.execute(stmt)
+            continue
+
+        # Other backends: update, then insert if the row didn't exist yet
+        result = connection.execute(
+            update(table)
+            .where(table.c.day == day, table.c.status == status, table.c.bucket == bucket)
+            .values(count=table.c.count + n)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(day=day, status=status, bucket=bucket, count=n))
+
+
+@event.listens_for(Session, "after_flush")
+def _roll_up_new_predictions(session, flush_context):
+    """Add newly inserted PredictionLogs to the rollup, inside the same transaction."""
+    counts = {}
+    for obj in session.new:
+        if not isinstance(obj, PredictionLog):
+            continue
+        created_at = obj.created_at or datetime.utcnow()
+        key = (created_at.date(), obj.status, confidence_bucket(obj.probability))
+        counts[key] = counts.get(key, 0) + 1
+
+    if counts:
+        _upsert_counts(session.connection(), counts)
+
+
+def rebuild_prediction_stats():
+    """Recompute the whole rollup from prediction_logs with a single GROUP BY. Caller commits."""
+    bucket = confidence_bucket_expr(PredictionLog.probability)
+    day = func.date(PredictionLog.created_at)
+    rows = db.session.query(day, PredictionLog.status, bucket, func.count(PredictionLog.id)).group_by(
+        day, PredictionLog.status, bucket
+    ).all()
+
+    db.session.query(PredictionStat).delete()
+    db.session.add_all([
+        PredictionStat(
+            day=d if not isinstance(d, str) else datetime.strptime(d, "%Y-%m-%d").date(),
+            status=status, bucket=b, count=n
+        )
+        for d, status, b, n in rows
+    ])
+    return len(rows)
@@ -0,0 +1,55 @@
+from extensions import db
+from datetime import datetime
+
+# ScoringJob.status
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# LoanApplication.scoring_status (NULL for loans scored inline before the queue existed)
+SCORING_PENDING = "pending"
+SCORING_DONE = "scored"
+SCORING_FAILED = "failed"
+
+
+class ScoringJob(db.Model):
+    """
+    One ML scoring request for a loan application, queued by apply_for_loan
+    and processed by `flask score-loans` (ml/scoring_queue.py).
+
+    A worker claims a job by stamping it with its own `claim_token`; jobs
+    whose worker died are reclaimed once `locked_at` is older than the lock
+    timeout. Failed attempts are retried at `run_after` until `max_attempts`.
+    """
+    __tablename__ = "scoring_jobs"
+    __table_args__ = (
+        # claim: WHERE status = 'queued' AND run_after <= now ORDER BY id
+        db.Index("ix_scoring_jobs_status_run_after", "status", "run_after"),
+        # the worker loading the jobs it just claimed
+        db.Index("ix_scoring_jobs_claim_token", "claim_token"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey("loan_applications.id"), nullable=False, unique=True)
+    payload = db.Column(db.JSON, nullable=False) # predictor input row
+
+    status = db.Column(db.String(20), nullable=False, default=JOB_QUEUED)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    loan = db.relationship("LoanApplication", backref=db.backref("scoring_job", uselist=False), lazy=True)
+
+    def to_dict(self):
+        return {
+            "status": self.status,
+            "attempts": self.attempts,
+            "next_attempt_at": self.run_after.isoformat() if self.status == JOB_QUEUED else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
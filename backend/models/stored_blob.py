@@ -0,0 +1,89 @@
+from extensions import db
+from datetime import datetime
+from sqlalchemy import update, delete
+from sqlalchemy.exc import IntegrityError
+
+
+class StoredBlob(db.Model):
+    """
+    One row per distinct file in the content store (utils/file_storage.py).
+    ref_count is the number of Documents pointing at it; the file can be
+    deleted once it drops to zero.
+    """
+    __tablename__ = "stored_blobs"
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def acquire(cls, sha256, size):
+        """
+        Add a reference to a blob, creating its row on first use. Caller commits.
+        A single upsert, so two uploads of the same new bytes can't both insert the row.
+        """
+        table = cls.__table__
+        connection = db.session.connection()
+        dialect = connection.dialect.name
+
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table).values(sha256=sha256, size=size, ref_count=1, created_at=datetime.utcnow())
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.sha256],
+                set_={"ref_count": table.c.ref_count + 1}
+            ))
+            return
+
+        # Other backends: update, else insert; a concurrent insert of the same row loses and updates instead
+        increment = update(table).where(table.c.sha256 == sha256).values(ref_count=table.c.ref_count + 1)
+        if connection.execute(increment).rowcount:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.connection().execute(
+                    table.insert().values(sha256=sha256, size=size, ref_count=1, created_at=datetime.utcnow())
+                )
+        except IntegrityError:
+            connection.execute(increment)
+
+    @classmethod
+    def unreferenced(cls, sha256s):
+        """The subset of `sha256s` with no row, i.e. files nothing points at (e.g. after a rollback)."""
+        sha256s = set(sha256s)
+        if not sha256s:
+            return set()
+        known = {sha for (sha,) in db.session.query(cls.sha256).filter(cls.sha256.in_(sha256s))}
+        return sha256s - known
+
+
+def sweep_unreferenced_blobs(min_age_seconds=3600, chunk_size=500):
+    """
+    Delete store files that no Document references (left behind when an upload's
+    transaction rolled back) and abandoned temp uploads, once they are older than
+    `min_age_seconds`. Uploads never delete blobs themselves: a concurrent upload
+    of the same bytes may be about to reference one. Returns the number of files removed.
+    """
+    from utils.file_storage import content_store
+
+    removed = 0
+    candidates = list(content_store.blobs_older_than(min_age_seconds))
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        unused = StoredBlob.unreferenced(chunk) | {
+            sha for (sha,) in db.session.query(StoredBlob.sha256).filter(
+                StoredBlob.sha256.in_(chunk), StoredBlob.ref_count <= 0
+            )
+        }
+        for sha256 in unused:
+            # Re-checked just before deleting: reused blobs have a fresh mtime
+            if content_store.delete_if_older(sha256, min_age_seconds):
+                db.session.execute(delete(StoredBlob).where(StoredBlob.sha256 == sha256, StoredBlob.ref_count <= 0))
+                removed += 1
+        db.session.commit()
+
+    return removed + content_store.remove_stale_uploads(min_age_seconds)
@@ -1,5 +1,6 @@
 from extensions import db
 from datetime import datetime
+from sqlalchemy import event, inspect
 
 class User(db.Model):
     __tablename__ = "users"
@@ -9,7 +10,20 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(20), default="user")
+    # Embedded in access tokens; bumping it revokes every token issued before
+    token_version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
-    loan_applications = db.relationship("LoanApplication", backref="user", lazy=True)
\ No newline at end of file
+    loan_applications = db.relationship("LoanApplication", backref="user", lazy=True)
+
+    def bump_token_version(self):
+        self.token_version = (self.token_version or 1) + 1
+
+
+# Changing what a token vouches for (role) or how it was obtained (password) revokes old tokens
+@event.listens_for(User.role, "set")
+@event.listens_for(User.password, "set")
+def _revoke_tokens_on_change(target, value, oldvalue, initiator):
+    if inspect(target).persistent and value != oldvalue:
+        target.bump_token_version()
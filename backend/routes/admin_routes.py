@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from utils.jwt_utils import jwt_required
 from utils.decorators import admin_required 
-from controllers.admin_controller import get_all_loans, update_loan_status
+from utils.db_routing import read_only
+from controllers.export_controller import export_records
+from controllers.admin_controller import (
+    get_all_loans, update_loan_status, update_installment_status, get_portfolio_projection, get_loan_amortization
+)
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -9,8 +13,9 @@ admin_bp = Blueprint('admin', __name__)
 @admin_bp.route('/loans', methods=['GET'])
 @jwt_required    
 @admin_required()  
+@read_only
 def list_all_loans():
-    response, status = get_all_loans()
+    response, status = get_all_loans(request.args)
     return jsonify(response), status
 
 # 2. Approve/Reject Loan
@@ -19,4 +24,38 @@ def list_all_loans():
 @admin_required()
 def change_status(loan_id):
     response, status = update_loan_status(request.json, loan_id)
-    return jsonify(response), status
\ No newline at end of file
+    return jsonify(response), status
+
+# 3. Record a payment / waiver for one installment
+@admin_bp.route('/loan/<int:loan_id>/installments/<int:month>', methods=['PUT'])
+@jwt_required
+@admin_required()
+def change_installment_status(loan_id, month):
+    response, status = update_installment_status(request.json, loan_id, month)
+    return jsonify(response), status
+
+# 4. Portfolio cash-flow projection (?months=N)
+@admin_bp.route('/portfolio/projection', methods=['GET'])
+@jwt_required
+@admin_required()
+@read_only
+def portfolio_projection():
+    response, status = get_portfolio_projection(request.args)
+    return jsonify(response), status
+
+# 5. Principal / interest split for one loan
+@admin_bp.route('/loan/<int:loan_id>/amortization', methods=['GET'])
+@jwt_required
+@admin_required()
+@read_only
+def loan_amortization(loan_id):
+    response, status = get_loan_amortization(loan_id)
+    return jsonify(response), status
+
+# 6. Streaming exports: /export/loans|repayments|predictions?format=ndjson|csv&start=&end=&status=
+@admin_bp.route('/export/<kind>', methods=['GET'])
+@jwt_required
+@admin_required()
+@read_only
+def export(kind):
+    return export_records(kind, request.args)
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from utils.jwt_utils import jwt_required
 from utils.decorators import admin_required
-from controllers.document_controller import upload_document, get_document_file, get_my_document_file
+from controllers.document_controller import (
+    upload_document, bulk_upload_documents, get_document_file, get_my_document_file,
+    get_document_preview, get_my_document_preview
+)
 
 document_bp = Blueprint('documents', __name__)
 
@@ -11,6 +14,12 @@ def upload(loan_id):
     response, status = upload_document(request, loan_id)
     return jsonify(response), status
 
+@document_bp.route('/upload/<int:loan_id>/bulk', methods=['POST'])
+@jwt_required
+def bulk_upload(loan_id):
+    response, status = bulk_upload_documents(request, loan_id)
+    return jsonify(response), status
+
 @document_bp.route('/view/<int:document_id>', methods=["GET"])
 @jwt_required
 @admin_required()
@@ -20,4 +29,15 @@ def view_file(document_id):
 @document_bp.route('/my-view/<int:document_id>', methods=["GET"])
 @jwt_required
 def view_my_file(document_id):
-    return get_my_document_file(document_id)
\ No newline at end of file
+    return get_my_document_file(document_id)
+
+@document_bp.route('/preview/<int:document_id>', methods=["GET"])
+@jwt_required
+@admin_required()
+def preview_file(document_id):
+    return get_document_preview(document_id)
+
+@document_bp.route('/my-preview/<int:document_id>', methods=["GET"])
+@jwt_required
+def preview_my_file(document_id):
+    return get_my_document_preview(document_id)
\ No newline at end of file
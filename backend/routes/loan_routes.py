@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from controllers.loan_controller import (
     apply_for_loan,
-    get_my_loans
+    get_my_loans,
+    get_scoring_status
 )
 from utils.jwt_utils import jwt_required
 
@@ -16,5 +17,11 @@ def apply():
 @loan_bp.route("/my-loans", methods=["GET"])
 @jwt_required
 def list_loans():
-    response, status = get_my_loans()
+    response, status = get_my_loans(request.args)
+    return jsonify(response), status
+
+@loan_bp.route("/<int:loan_id>/scoring", methods=["GET"])
+@jwt_required
+def scoring_status(loan_id):
+    response, status = get_scoring_status(loan_id)
     return jsonify(response), status
\ No newline at end of file
@@ -1,8 +1,13 @@
-from flask import Blueprint, request, jsonify
-from ml.predictor import predictor
+from flask import Blueprint, request, jsonify, current_app
+from ml.predictor import predictor, parse_explain
+from ml.registry import model_registry
+from ml.prediction_cache import prediction_cache
 
 ml_bp = Blueprint('ml', __name__)
 
+# Check major ones
+REQUIRED_FIELDS = ['loan_amount', 'cibil_score', 'income_annum']
+
 @ml_bp.route('/predict', methods=['POST'])
 def predict_loan_approval():
     try:
@@ -10,13 +15,17 @@ def predict_loan_approval():
         
         # We now pass the whole data object to the predictor
         # Validation can be enhanced here, but for now we trust predictor handles missing keys with defaults or errors
-        required_fields = ['loan_amount', 'cibil_score', 'income_annum'] # Check major ones
-        
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
 
-        result = predictor.predict(data)
+        # ?explain=none|full|top5 (default full)
+        try:
+            explain = parse_explain(request.args.get('explain', data.get('explain')))
+        except ValueError:
+            return jsonify({"error": "explain must be 'none', 'full' or 'top<k>'"}), 400
+
+        result = predictor.predict(data, explain=explain)
         
         if "error" in result:
             return jsonify(result), 500
@@ -25,3 +34,50 @@ def predict_loan_approval():
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@ml_bp.route('/predict/batch', methods=['POST'])
+def predict_loan_approval_batch():
+    try:
+        data = request.get_json()
+
+        # Accept either a bare list or {"applications": [...]}
+        rows = data.get('applications') if isinstance(data, dict) else data
+        explain_option = data.get('explain') if isinstance(data, dict) else None
+        if not isinstance(rows, list) or not rows:
+            return jsonify({"error": "Expected a non-empty list of applications"}), 400
+
+        max_size = current_app.config['ML_BATCH_MAX_SIZE']
+        if len(rows) > max_size:
+            return jsonify({"error": f"Batch too large (max {max_size} applications)"}), 413
+
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                return jsonify({"error": f"Application {index} must be an object"}), 400
+            for field in REQUIRED_FIELDS:
+                if field not in row:
+                    return jsonify({"error": f"Application {index}: missing required field: {field}"}), 400
+
+        try:
+            explain = parse_explain(request.args.get('explain', explain_option))
+        except ValueError:
+            return jsonify({"error": "explain must be 'none', 'full' or 'top<k>'"}), 400
+
+        results = predictor.predict_batch(rows, explain=explain)
+
+        if isinstance(results, dict) and "error" in results:
+            return jsonify(results), 500
+
+        return jsonify({"count": len(results), "results": results}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@ml_bp.route('/ready', methods=['GET'])
+def model_ready():
+    # Readiness probe: loads the model on first call and reports the serving version
+    status = model_registry.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+@ml_bp.route('/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(prediction_cache.stats()), 200
@@ -1,11 +1,13 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from utils.jwt_utils import jwt_required
+from utils.db_routing import read_only
 from controllers.repayment_controller import get_schedule
 
 repayment_bp = Blueprint('repayments', __name__)
 
 @repayment_bp.route('/<int:loan_id>', methods=['GET'])
 @jwt_required
+@read_only
 def view_schedule(loan_id):
-    response, status = get_schedule(loan_id)
+    response, status = get_schedule(loan_id, request.args)
     return jsonify(response), status
\ No newline at end of file
@@ -0,0 +1,242 @@
+# Offline benchmark suite: in-process app + throwaway SQLite database.
+# Usage (from backend/): python run_benchmarks.py [--iterations N] [--output results.json] [--compare previous.json]
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+# Point the app at a fresh SQLite file before config.py reads the environment
+DB_DIR = tempfile.mkdtemp(prefix="smartlend-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'bench.db')}"
+
+import numpy as np
+import pandas as pd
+from app import create_app
+from extensions import db
+from models.user import User
+from ml.predictor import predictor, LOG_COMMIT
+from ml.log_writer import log_writer
+from ml.prediction_cache import prediction_cache
+from ml.scoring_queue import ScoringWorker
+from utils.jwt_utils import create_access_token
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BACKEND_DIR, '../ml/loan_approval_dataset.csv')
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmark_results')
+
+# Metric compared by --compare, and the relative change reported as a regression
+COMPARE_METRIC = "p95_ms"
+REGRESSION_THRESHOLD = 0.10
+
+
+def load_payloads():
+    """Real applicant profiles from the dataset, so the prediction cache sees distinct inputs."""
+    df = pd.read_csv(DATASET_PATH, skipinitialspace=True)
+    df.columns = df.columns.str.strip()
+    df = df.drop(columns=['loan_id', 'loan_status'])
+    for column in ('education', 'self_employed'):
+        df[column] = df[column].str.strip()
+    return df.to_dict(orient='records')
+
+
+def summarize(latencies, rows_per_op=1):
+    latencies = np.asarray(latencies)
+    total = latencies.sum()
+    return {
+        "count": int(len(latencies)),
+        "mean_ms": round(float(latencies.mean()) * 1000, 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 4),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 4),
+        "max_ms": round(float(latencies.max()) * 1000, 4),
+        "ops_per_s": round(len(latencies) / total, 2),
+        "rows_per_s": round(len(latencies) * rows_per_op / total, 2)
+    }
+
+
+def measure(fn, iterations, warmup=10, rows_per_op=1):
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    # Don't let queued log writes bleed into the next benchmark
+    log_writer.flush()
+    return summarize(latencies, rows_per_op)
+
+
+def check(response, expected=200):
+    if response.status_code != expected:
+        raise RuntimeError(f"Unexpected {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+
+def run(iterations, batch_size):
+    warnings.filterwarnings("ignore")
+    app = create_app()
+    payloads = load_payloads()
+
+    def payload(i):
+        return payloads[i % len(payloads)]
+
+    def batch(i):
+        start = (i * batch_size) % len(payloads)
+        rows = payloads[start:start + batch_size]
+        return rows if len(rows) == batch_size else payloads[:batch_size]
+
+    results = {}
+    with app.app_context():
+        db.create_all()
+
+        user = User(name="Bench", email="bench@example.com", password="x")
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(user.id, version=user.token_version)}"}
+
+        bundle = predictor.registry.get()
+        client = app.test_client()
+
+        print("Benchmarking LoanPredictor.predict...")
+        prediction_cache.clear()
+        results["predictor.predict"] = measure(lambda i: predictor.predict(payload(i)), iterations)
+
+        print("Benchmarking LoanPredictor.predict (cache hits)...")
+        results["predictor.predict_cached"] = measure(lambda i: predictor.predict(payload(0)), iterations)
+
+        print(f"Benchmarking LoanPredictor.predict_batch ({batch_size} rows)...")
+        results["predictor.predict_batch"] = measure(
+            lambda i: predictor.predict_batch(batch(i), log_mode=LOG_COMMIT),
+            max(iterations // 10, 10), rows_per_op=batch_size
+        )
+
+        print("Benchmarking POST /api/ml/predict...")
+        prediction_cache.clear()
+        results["POST /api/ml/predict"] = measure(
+            lambda i: check(client.post('/api/ml/predict', json=payload(i))), iterations
+        )
+
+        print(f"Benchmarking POST /api/ml/predict/batch ({batch_size} rows)...")
+        results["POST /api/ml/predict/batch"] = measure(
+            lambda i: check(client.post('/api/ml/predict/batch', json={"applications": batch(i)})),
+            max(iterations // 10, 10), rows_per_op=batch_size
+        )
+
+        # Scored inside the request, as in results from before the scoring queue, so numbers stay comparable
+        print("Benchmarking POST /api/loans/apply (inline scoring)...")
+        app.config['LOAN_SCORING_MODE'] = 'inline'
+        prediction_cache.clear()
+
+        def apply(i):
+            row = payload(i)
+            check(client.post('/api/loans/apply', headers=headers, json={
+                "loan_type": "Personal",
+                "amount": row["loan_amount"],
+                "tenure_months": int(row["loan_term"]) * 12,
+                "monthly_salary": row["income_annum"] / 12,
+                "credit_history": row["cibil_score"],
+                "assets_value": row["residential_assets_value"],
+                "education": row["education"],
+                "self_employed": row["self_employed"],
+                "no_of_dependents": row["no_of_dependents"]
+            }), expected=201)
+        results["POST /api/loans/apply"] = measure(apply, iterations)
+
+        print("Benchmarking POST /api/loans/apply (queued scoring)...")
+        app.config['LOAN_SCORING_MODE'] = 'queue'
+        results["POST /api/loans/apply (queued)"] = measure(apply, iterations)
+
+        print(f"Benchmarking ScoringWorker batches ({batch_size} jobs)...")
+        worker = ScoringWorker(app)
+        worker.batch_size = batch_size
+        latencies = []
+        while True:
+            start = time.perf_counter()
+            claimed = worker.run_once()
+            # Only full batches, so rows/s isn't skewed by the remainder
+            if claimed == batch_size:
+                latencies.append(time.perf_counter() - start)
+            elif claimed == 0:
+                break
+        if latencies:
+            results["ScoringWorker.run_once"] = summarize(latencies, rows_per_op=batch_size)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model_version": bundle.version if bundle else None,
+            "iterations": iterations,
+            "batch_size": batch_size,
+            "database": "sqlite",
+            # "POST /api/loans/apply" scores inline; "(queued)" only enqueues, ScoringWorker.run_once scores
+            "apply_scoring_modes": {"POST /api/loans/apply": "inline", "POST /api/loans/apply (queued)": "queue"}
+        },
+        "benchmarks": results
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(report, baseline=None):
+    print(f"\n{'benchmark':<30} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'rows/s':>11}", end="")
+    print(f" {'vs base':>9}" if baseline else "")
+    for name, stats in report["benchmarks"].items():
+        line = (f"{name:<30} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats['p99_ms']:>10} "
+                f"{stats['ops_per_s']:>10} {stats['rows_per_s']:>11}")
+        if baseline:
+            base = baseline["benchmarks"].get(name)
+            if base:
+                change = (stats[COMPARE_METRIC] - base[COMPARE_METRIC]) / base[COMPARE_METRIC]
+                flag = "  REGRESSION" if change > REGRESSION_THRESHOLD else ""
+                line += f" {change:>+8.1%}{flag}"
+            else:
+                line += f" {'new':>9}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline latency/throughput benchmarks for the ML and loan endpoints.")
+    parser.add_argument('--iterations', type=int, default=500, help="Calls per single-row benchmark (default: 500)")
+    parser.add_argument('--batch-size', type=int, default=100, help="Rows per batch call (default: 100)")
+    parser.add_argument('--output', help="Results JSON path (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument('--compare', help="Previous results JSON to compare p95 latency against")
+    args = parser.parse_args()
+
+    try:
+        report = run(args.iterations, args.batch_size)
+    finally:
+        log_writer.shutdown()
+        shutil.rmtree(DB_DIR, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.utcnow().strftime('%Y%m%dT%H%M%SZ') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import numpy as np
+
+# Loans processed per block when projecting a whole portfolio, bounding the
+# (loans x months) matrices to a few MB however large the book is
+PROJECTION_CHUNK_SIZE = 4096
+
+
+def _as_arrays(principal, annual_rate, tenure_months):
+    principal = np.atleast_1d(np.asarray(principal, dtype=np.float64))
+    rate = np.atleast_1d(np.asarray(annual_rate, dtype=np.float64)) / 12 / 100
+    tenure = np.atleast_1d(np.asarray(tenure_months, dtype=np.int64))
+    principal, rate, tenure = np.broadcast_arrays(principal, rate, tenure)
+    if np.any(tenure < 1):
+        raise ValueError("tenure_months must be at least 1")
+    return principal, rate, tenure
+
+
+def monthly_emi(principal, annual_rate, tenure_months):
+    """
+    EMI = P * r * (1 + r)^n / ((1 + r)^n - 1), with r the monthly rate.
+    Accepts scalars or arrays (broadcast together); returns an array.
+    Zero-rate loans repay P / n per month.
+    """
+    return _emi(*_as_arrays(principal, annual_rate, tenure_months))
+
+
+def _emi(principal, rate, tenure):
+    growth = np.power(1 + rate, tenure)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        emi = principal * rate * growth / (growth - 1)
+    return np.where(rate == 0, principal / tenure, emi)
+
+
+def amortize(principal, annual_rate, tenure_months):
+    """
+    Full amortization schedules for many loans in one pass.
+
+    Returns a dict of arrays:
+      emi        (loans,)
+      principal  (loans, months)  principal repaid in each month
+      interest   (loans, months)  interest paid in each month
+      balance    (loans, months)  outstanding balance after each month
+    `months` is the longest tenure; columns past a loan's own tenure are 0.
+    """
+    return _amortize(*_as_arrays(principal, annual_rate, tenure_months))
+
+
+def _amortize(principal, rate, tenure):
+    emi = _emi(principal, rate, tenure)
+    months = int(tenure.max())
+
+    # Closed form for the balance after k payments:
+    #   B_k = P (1 + r)^k - EMI ((1 + r)^k - 1) / r      (r > 0)
+    #   B_k = P - k EMI                                 (r = 0)
+    k = np.arange(months + 1, dtype=np.float64)
+    growth = np.power(1 + rate[:, None], k[None, :])
+    safe_rate = np.where(rate == 0, 1.0, rate)[:, None]
+    balance = np.where(
+        rate[:, None] == 0,
+        principal[:, None] - k[None, :] * emi[:, None],
+        principal[:, None] * growth - emi[:, None] * (growth - 1) / safe_rate
+    )
+
+    active = k[None, 1:] <= tenure[:, None]
+    # The last payment clears the loan exactly (no float residue carried forward)
+    balance = np.where(k[None, :] >= tenure[:, None], 0.0, balance)
+
+    interest = np.where(active, balance[:, :-1] * rate[:, None], 0.0)
+    principal_paid = np.where(active, balance[:, :-1] - balance[:, 1:], 0.0)
+
+    return {
+        "emi": emi,
+        "principal": principal_paid,
+        "interest": interest,
+        "balance": np.where(active, balance[:, 1:], 0.0)
+    }
+
+
+def project_cash_flows(principal, annual_rate, tenure_months, first_month_offset, horizon):
+    """
+    Portfolio cash flows per calendar month, summed over loans.
+
+    `first_month_offset` is, per loan, the index (relative to the projection's
+    month 0) of its first installment; installments before month 0 or at/after
+    `horizon` are dropped. Returns a dict of (horizon,) arrays: principal,
+    interest, total, and balance (outstanding at the end of each month).
+    """
+    principal, rate, tenure = _as_arrays(principal, annual_rate, tenure_months)
+    offset = np.broadcast_to(np.asarray(first_month_offset, dtype=np.int64), principal.shape)
+    totals = {name: np.zeros(horizon) for name in ("principal", "interest", "balance")}
+
+    for start in range(0, len(principal), PROJECTION_CHUNK_SIZE):
+        block = slice(start, start + PROJECTION_CHUNK_SIZE)
+        schedule = _amortize(principal[block], rate[block], tenure[block])
+        months = schedule["principal"].shape[1]
+
+        # Calendar month of every (loan, installment) cell
+        calendar = offset[block, None] + np.arange(months)[None, :]
+        in_window = (calendar >= 0) & (calendar < horizon)
+        columns = calendar[in_window]
+        for name in ("principal", "interest", "balance"):
+            np.add.at(totals[name], columns, schedule[name][in_window])
+
+        # Loans whose first installment is after the window start carry their full
+        # principal as outstanding balance until then
+        pending = np.clip(offset[block], 0, horizon)
+        not_started = np.arange(horizon)[None, :] < pending[:, None]
+        totals["balance"] += (not_started * principal[block, None]).sum(axis=0)
+
+    totals["total"] = totals["principal"] + totals["interest"]
+    return totals
@@ -0,0 +1,110 @@
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+# SQLALCHEMY_BINDS key of the read replica
+REPLICA_BIND = "replica"
+
+# Set by @read_only for the duration of a view; read by RoutingSession.get_bind
+_read_only = ContextVar("db_read_only", default=False)
+# Set when a replica statement failed during the current read_only view
+_replica_failed = ContextVar("db_replica_failed", default=False)
+
+
+class ReplicaRouter:
+    """
+    Tracks whether the replica is usable. A connection or statement error on
+    the replica takes it out of rotation for `retry_interval` seconds, during
+    which read-only views are served by the primary.
+    """
+
+    def __init__(self, retry_interval=30.0):
+        self.retry_interval = retry_interval
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._engine = None
+
+    def init_app(self, app, db):
+        self.retry_interval = app.config.get('DB_REPLICA_RETRY_INTERVAL', self.retry_interval)
+        with app.app_context():
+            engine = db.engines.get(REPLICA_BIND)
+        if engine is not None and engine is not self._engine:
+            self._engine = engine
+            sa.event.listen(engine, "handle_error", self._on_error)
+
+    def available(self):
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self):
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_interval
+        print(f"DB replica unavailable; using the primary for {self.retry_interval}s")
+
+    def _on_error(self, context):
+        # Connection refused, replica lagging behind a migration, ...: stop using it for a while
+        self.mark_down()
+        _replica_failed.set(True)
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """
+    db.session class that sends SELECTs to the replica bind inside @read_only
+    views (when one is configured and healthy). Flushes, writes and everything
+    outside read_only views use the primary as before.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and _read_only.get()
+            and not self._flushing
+            and isinstance(clause, sa.sql.Select)
+            and replica_router.available()
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(fn):
+    """
+    Mark a view as read-only so its queries may be served by the replica.
+    If a replica query fails, the view is re-run once against the primary.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        from extensions import db
+
+        if REPLICA_BIND not in db.engines or not replica_router.available():
+            return fn(*args, **kwargs)
+
+        read_token = _read_only.set(True)
+        failed_token = _replica_failed.set(False)
+        try:
+            try:
+                response = fn(*args, **kwargs)
+            except sa.exc.DBAPIError:
+                if not _replica_failed.get():
+                    raise
+                response = None
+            replica_failed = _replica_failed.get()
+        finally:
+            _read_only.reset(read_token)
+            _replica_failed.reset(failed_token)
+
+        if not replica_failed:
+            return response
+
+        # Replica failed mid-view (the controller may have turned it into a 500): retry on the primary
+        db.session.rollback()
+        return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,165 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Source types each renderer handles
+IMAGE_TYPES = {'png', 'jpg', 'jpeg'}
+PDF_TYPES = {'pdf'}
+PREVIEW_MIMETYPE = 'image/jpeg'
+
+
+def _flatten(image):
+    """RGB copy of `image`, with transparency composited onto white."""
+    from PIL import Image
+
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_image(source, size):
+    from PIL import Image
+
+    with Image.open(source) as image:
+        # JPEGs are decoded at a reduced scale straight away instead of at full size
+        image.draft('RGB', (size, size))
+        image.thumbnail((size, size))
+        return _flatten(image)
+
+
+def render_pdf(source, size):
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(source)
+    try:
+        page = pdf[0]
+        # Page sizes are in points (1/72 in); render the first page at preview size only
+        width, height = page.get_size()
+        bitmap = page.render(scale=size / max(width, height, 1))
+        image = bitmap.to_pil()
+        image.thumbnail((size, size))
+        return _flatten(image)
+    finally:
+        pdf.close()
+
+
+class PreviewGenerator:
+    """
+    Renders small JPEG previews of uploaded documents on a local thread pool:
+    a thumbnail for images and the first page for PDFs.
+
+    Previews are cached on disk by content hash and size
+    (<root>/<sha[0:2]>/<sha>-<size>.jpg), so identical uploads share one
+    preview and a render happens at most once per blob. Pillow is needed for
+    any preview and pypdfium2 for PDFs; without them documents simply have none.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 320
+        self.quality = 80
+        self.max_workers = 2
+        self.retry_failed_after = 300.0
+        self._executor = None
+        self._pid = None
+        self._pending = {}
+        self._failed = {}  # sha256 -> monotonic time after which a failed render may be retried
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.root = app.config.get('DOCUMENT_PREVIEW_FOLDER') or os.path.join(app.config['UPLOAD_FOLDER'], 'previews')
+        self.size = app.config.get('DOCUMENT_PREVIEW_SIZE', self.size)
+        self.quality = app.config.get('DOCUMENT_PREVIEW_QUALITY', self.quality)
+        self.max_workers = app.config.get('DOCUMENT_PREVIEW_WORKERS', self.max_workers)
+        self.retry_failed_after = app.config.get('DOCUMENT_PREVIEW_RETRY_FAILED_AFTER', self.retry_failed_after)
+        os.makedirs(self.root, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.root is not None and self.max_workers > 0
+
+    def supports(self, file_type):
+        file_type = (file_type or '').lower()
+        try:
+            if file_type in IMAGE_TYPES:
+                import PIL  # noqa: F401
+                return True
+            if file_type in PDF_TYPES:
+                import PIL  # noqa: F401
+                import pypdfium2  # noqa: F401
+                return True
+        except ImportError:
+            pass
+        return False
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, sha256[:2], f"{sha256}-{self.size}.jpg")
+
+    def get(self, sha256):
+        """Path of the cached preview, or None if it hasn't been rendered (yet)."""
+        path = self.path_for(sha256)
+        return path if os.path.exists(path) else None
+
+    def _pool(self):
+        # Threads do not survive fork (e.g. gunicorn --preload), so create the pool lazily per process
+        if self._executor is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._pending = {}
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="document-preview")
+        return self._executor
+
+    def submit(self, sha256, file_type, source):
+        """
+        Queue a render of `source` (the stored blob) unless its preview is
+        cached, already queued or failed recently. Returns the Future of the
+        queued render, or None when there is nothing to wait for.
+        """
+        if not self.enabled or not self.supports(file_type) or self.get(sha256):
+            return None
+
+        with self._lock:
+            # Failures may be transient (blob not readable yet, disk full): retry once the entry expires
+            retry_at = self._failed.get(sha256)
+            if retry_at is not None:
+                if time.monotonic() < retry_at:
+                    return None
+                del self._failed[sha256]
+            future = self._pending.get(sha256)
+            if future is None:
+                future = self._pool().submit(self._render, sha256, file_type.lower(), source)
+                self._pending[sha256] = future
+            return future
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _render(self, sha256, file_type, source):
+        target = self.path_for(sha256)
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        try:
+            render = render_pdf if file_type in PDF_TYPES else render_image
+            image = render(source, self.size)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            image.save(tmp, 'JPEG', quality=self.quality, optimize=True)
+            os.replace(tmp, target)
+            return target
+        except Exception as e:
+            print(f"Preview for {sha256} failed: {e}")
+            with self._lock:
+                self._failed[sha256] = time.monotonic() + self.retry_failed_after
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(sha256, None)
+
+
+preview_generator = PreviewGenerator()
+atexit.register(preview_generator.shutdown)
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from flask import Request
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class HashingUpload:
+    """
+    File object handed to Werkzeug's multipart parser. Upload bytes go straight
+    to a temp file inside the content store while being hashed, so an upload is
+    never held in memory and never read a second time. The temp file is deleted
+    on close unless ContentStore.commit() moved it into place.
+    """
+
+    def __init__(self, directory):
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix="upload-")
+        self._file = os.fdopen(fd, "w+b")
+        self._hash = hashlib.sha256()
+        self.size = 0
+        self.committed = False
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self.committed and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush/... for FileStorage and the parser
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class ContentStore:
+    """
+    Content-addressed blob store on local disk.
+
+    A blob lives at <root>/<sha[0:2]>/<sha[2:4]>/<sha>, so identical uploads
+    share one file and names can never collide. Reference counts are kept in
+    the stored_blobs table (models/stored_blob.py), not here.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+
+    def init_app(self, app):
+        self.root = app.config.get('DOCUMENT_STORE_FOLDER') or os.path.join(app.config['UPLOAD_FOLDER'], 'store')
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    @property
+    def _tmp_dir(self):
+        return os.path.join(self.root, 'tmp')
+
+    def open_upload(self):
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        return HashingUpload(self._tmp_dir)
+
+    def path_for(self, sha256):
+        if not SHA256_RE.match(sha256 or ""):
+            raise ValueError("Invalid content hash")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def commit(self, upload):
+        """
+        Move a finished upload to its content address. Returns True if the
+        blob was new, False if an identical file was already stored.
+        """
+        upload.flush()
+        os.fsync(upload.fileno())
+        target = self.path_for(upload.sha256)
+        if os.path.exists(target):
+            # About to gain a reference: a fresh mtime keeps sweep_unreferenced_blobs off it
+            os.utime(target)
+            return False
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(upload.path, target)
+        upload.committed = True
+        return True
+
+    def delete(self, sha256):
+        path = self.path_for(sha256)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def blobs_older_than(self, seconds):
+        """Yield the sha256 of every stored blob last written or reused more than `seconds` ago."""
+        cutoff = time.time() - seconds
+        for directory, _, names in os.walk(self.root):
+            if directory == self._tmp_dir:
+                continue
+            for name in names:
+                if SHA256_RE.match(name) and os.path.getmtime(os.path.join(directory, name)) < cutoff:
+                    yield name
+
+    def delete_if_older(self, sha256, seconds):
+        """Delete a blob unless it was written or reused in the last `seconds`. Returns True if deleted."""
+        path = self.path_for(sha256)
+        try:
+            if os.path.getmtime(path) >= time.time() - seconds:
+                return False
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def remove_stale_uploads(self, seconds):
+        """Remove temp uploads left behind by crashed workers. Returns how many were removed."""
+        cutoff = time.time() - seconds
+        removed = 0
+        for entry in os.scandir(self._tmp_dir):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+content_store = ContentStore()
+
+
+class StreamingUploadRequest(Request):
+    """Request class whose multipart file parts stream into the content store."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return content_store.open_upload()
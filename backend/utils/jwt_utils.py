@@ -3,16 +3,23 @@ from datetime import datetime, timedelta
 import jwt
 
 from flask import request, jsonify, current_app, g
+from utils.user_cache import user_cache, AuthUser
 
 
-def create_access_token(identity, expires_minutes=60):
-    """Create a JWT access token encoding the given identity (usually user id)."""
+def create_access_token(identity, expires_minutes=60, version=None):
+    """Create a JWT access token encoding the given identity (usually user id).
+
+    `version` (the user's token_version) is embedded as the "ver" claim; a
+    token is rejected once the user's token_version has moved past it.
+    """
     now = datetime.utcnow()
     payload = {
         "sub": str(identity),  # Convert to string
         "iat": now,
         "exp": now + timedelta(minutes=expires_minutes),
     }
+    if version is not None:
+        payload["ver"] = version
     secret_key = current_app.config.get("JWT_SECRET_KEY")
     token = jwt.encode(payload, secret_key, algorithm="HS256")
     # PyJWT may return bytes in some versions
@@ -27,15 +34,38 @@ def decode_token(token):
     return jwt.decode(token, secret_key, algorithms=["HS256"])
 
 
+def load_auth_user(user_id, token_version=1):
+    """Return the AuthUser for `user_id`, or None if unknown or the token was revoked.
+
+    Served from the user cache when its version matches the token's; the DB is
+    only read on a miss, or when the token is newer than the cached entry.
+    """
+    from models.user import User
+
+    cached = user_cache.get(user_id)
+    if cached is not None and token_version == cached.token_version:
+        return cached
+    if cached is not None and token_version < cached.token_version:
+        return None
+
+    user = User.query.get(user_id)
+    if not user:
+        return None
+    auth_user = AuthUser.from_user(user)
+    user_cache.set(user_id, auth_user)
+
+    if token_version != auth_user.token_version:
+        return None
+    return auth_user
+
+
 def jwt_required(fn):
-    """Decorator to protect routes and load `g.current_user`.
+    """Decorator to protect routes and load `g.current_user` (an AuthUser).
 
     Expects Authorization header: "Bearer <token>".
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        from models.user import User
-        
         auth_header = request.headers.get("Authorization", None)
         if not auth_header:
             return jsonify({"message": "Missing Authorization header"}), 401
@@ -61,9 +91,14 @@ def jwt_required(fn):
         except (ValueError, TypeError):
             return jsonify({"message": "Invalid token payload"}), 401
 
-        user = User.query.get(user_id)
+        # Tokens without a "ver" claim predate token versions: version 1 is the column default
+        token_version = payload.get("ver", 1)
+        if not isinstance(token_version, int):
+            return jsonify({"message": "Invalid token payload"}), 401
+
+        user = load_auth_user(user_id, token_version)
         if not user:
-            return jsonify({"message": "User not found"}), 401
+            return jsonify({"message": "User not found or token revoked"}), 401
 
         g.current_user = user
         return fn(*args, **kwargs)
@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import or_, and_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque keyset cursor for a (created_at, id) position."""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises InvalidCursor on anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def parse_page_size(args, default, maximum):
+    """Read ?limit= from request args, capped at maximum. Raises ValueError unless it is a positive int."""
+    limit = args.get("limit")
+    if limit is None:
+        return default
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer") from None
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
+
+
+def parse_fields(args, allowed):
+    """Read ?fields=a,b,c. Returns None (all fields) or the requested subset; unknown names raise ValueError."""
+    fields = args.get("fields")
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return set(requested)
+
+
+def keyset_before(query, created_col, id_col, cursor):
+    """Rows strictly after `cursor` in (created_at DESC, id DESC) order."""
+    created_at, row_id = cursor
+    return query.filter(or_(
+        created_col < created_at,
+        and_(created_col == created_at, id_col < row_id)
+    ))
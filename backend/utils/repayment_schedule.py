@@ -0,0 +1,61 @@
+from dateutil.relativedelta import relativedelta
+
+# How a loan's installments are stored once it is approved
+SCHEDULE_MATERIALIZED = "materialized"  # one LoanRepayment row per month, written at approval
+SCHEDULE_VIRTUAL = "virtual"            # loan terms only; rows exist just for paid/waived months
+
+SCHEDULE_MODES = (SCHEDULE_MATERIALIZED, SCHEDULE_VIRTUAL)
+
+STATUS_PENDING = "Pending"
+STATUS_PAID = "Paid"
+STATUS_WAIVED = "Waived"
+
+INSTALLMENT_STATUSES = (STATUS_PENDING, STATUS_PAID, STATUS_WAIVED)
+
+# Installments that no longer need paying (compared case-insensitively)
+SETTLED_STATUSES = (STATUS_PAID.lower(), STATUS_WAIVED.lower())
+
+
+def is_virtual(loan):
+    return loan.schedule_mode == SCHEDULE_VIRTUAL
+
+
+def is_settled(status):
+    return (status or "").lower() in SETTLED_STATUSES
+
+
+def due_date_for(loan, month):
+    """Due date of installment `month` (1-based) of a virtual schedule."""
+    return loan.schedule_start + relativedelta(months=month)
+
+
+def virtual_installments(loan, overrides, from_month=1, count=None):
+    """
+    Generate installments from_month .. from_month+count-1 of a virtual schedule.
+
+    `overrides` maps month_number -> LoanRepayment for months with stored state
+    (payments, waivers); every other month is Pending at the loan's EMI.
+    """
+    if loan.schedule_start is None:
+        return []
+
+    last_month = loan.tenure_months if count is None else min(loan.tenure_months, from_month + count - 1)
+    output = []
+    for month in range(from_month, last_month + 1):
+        stored = overrides.get(month)
+        output.append({
+            "month": month,
+            "date": due_date_for(loan, month).strftime('%Y-%m-%d'),
+            "amount": stored.emi_amount if stored else loan.emi_amount,
+            "status": stored.paid_status if stored else STATUS_PENDING
+        })
+    return output
+
+
+def next_unsettled_month(tenure_months, settled_months):
+    """First month in 1..tenure_months that isn't settled, or None if all are."""
+    settled = set(settled_months)
+    for month in range(1, tenure_months + 1):
+        if month not in settled:
+            return month
+    return None
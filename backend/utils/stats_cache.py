@@ -0,0 +1,107 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class StatsCache:
+    """
+    Single-value cache for an expensive, frequently polled response.
+
+    - Entries expire after `ttl` seconds, or as soon as a commit touches one of
+      the `watch` model classes (new or deleted rows).
+    - Only one caller recomputes at a time. While it does, other callers get
+      the previous value if there is one, or wait for the new one.
+    Invalidation is per process; other workers see changes after at most `ttl`.
+    """
+
+    def __init__(self, name, ttl=5.0, watch=()):
+        self.name = name
+        self.ttl = ttl
+        self.watch = tuple(watch)
+        self._value = None
+        self._computed_at = None
+        self._fresh = False
+        self._generation = 0
+        self._computing = False
+        self._cond = threading.Condition()
+        self._listening = False
+
+    def init_app(self, app, ttl_key=None):
+        if ttl_key:
+            self.ttl = app.config.get(ttl_key, self.ttl)
+        if self.watch and not self._listening:
+            self._listening = True
+            event.listen(Session, "after_flush", self._track_changes)
+            event.listen(Session, "after_commit", self._commit)
+            event.listen(Session, "after_rollback", self._rollback)
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def _is_fresh(self):
+        return self._fresh and self._computed_at is not None and time.monotonic() - self._computed_at < self.ttl
+
+    def _age(self):
+        return time.monotonic() - self._computed_at
+
+    def get_or_compute(self, compute):
+        """Return (value, age_seconds). `compute` is only called by one thread at a time."""
+        if not self.enabled:
+            return compute(), 0.0
+
+        with self._cond:
+            while True:
+                if self._is_fresh():
+                    return self._value, self._age()
+                if not self._computing:
+                    break
+                if self._computed_at is not None:
+                    # Someone is already refreshing; serve the previous value meanwhile
+                    return self._value, self._age()
+                self._cond.wait()
+
+            self._computing = True
+            generation = self._generation
+
+        started_at = time.monotonic()
+        try:
+            value = compute()
+        except Exception:
+            with self._cond:
+                self._computing = False
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._value = value
+            self._computed_at = started_at
+            # A commit landed while we were computing: keep the value, but don't trust it
+            self._fresh = generation == self._generation
+            self._computing = False
+            self._cond.notify_all()
+        return value, time.monotonic() - started_at
+
+    def invalidate(self):
+        with self._cond:
+            self._generation += 1
+            self._fresh = False
+
+    # Session hooks: remember that a watched model changed, act once it is committed
+    def _track_changes(self, session, flush_context):
+        for obj in list(session.new) + list(session.deleted):
+            if isinstance(obj, self.watch):
+                session.info[self._info_key] = True
+                return
+
+    def _commit(self, session):
+        if session.info.pop(self._info_key, False):
+            self.invalidate()
+
+    def _rollback(self, session):
+        session.info.pop(self._info_key, None)
+
+    @property
+    def _info_key(self):
+        return f"stats_cache_dirty:{self.name}"
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class AuthUser:
+    """
+    Detached snapshot of a User for request handling (`g.current_user`).
+    Safe to share across requests and threads, unlike an ORM instance.
+    """
+    __slots__ = ("id", "name", "email", "role", "token_version")
+
+    def __init__(self, id, name, email, role, token_version):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.token_version = token_version
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.name, user.email, user.role, user.token_version or 1)
+
+
+class UserCache:
+    """
+    Thread-safe LRU cache of AuthUser snapshots by user id, with a TTL.
+
+    Entries are dropped when a commit in this process changes or deletes the
+    user; other processes pick the change up within `ttl` seconds.
+    """
+
+    def __init__(self, max_size=4096, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def init_app(self, app):
+        self.max_size = app.config.get('AUTH_USER_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('AUTH_USER_CACHE_TTL', self.ttl)
+        if not self._listening:
+            self._listening = True
+            event.listen(Session, "after_flush", self._track_changes)
+            event.listen(Session, "after_commit", self._commit)
+            event.listen(Session, "after_rollback", self._rollback)
+
+    @property
+    def enabled(self):
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, user_id):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return value
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, value):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    # Session hooks: collect changed users during flush, evict them once committed
+    def _track_changes(self, session, flush_context):
+        from models.user import User
+        changed = session.info.setdefault("user_cache_evict", set())
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, User) and obj.id is not None:
+                changed.add(obj.id)
+
+    def _commit(self, session):
+        for user_id in session.info.pop("user_cache_evict", ()):
+            self.invalidate(user_id)
+
+    def _rollback(self, session):
+        session.info.pop("user_cache_evict", None)
+
+
+user_cache = UserCache()
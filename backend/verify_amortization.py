@@ -0,0 +1,90 @@
+from decimal import Decimal
+import numpy as np
+from utils.amortization import monthly_emi, amortize, project_cash_flows
+
+# (principal, annual rate %, months) -> EMI from the closed form, rounded to paise
+KNOWN_EMIS = [
+    (100000, 10.0, 12, 8791.59),
+    (500000, 10.0, 24, 23072.46),
+    (1000000, 8.5, 240, 8678.23),
+    (250000, 12.0, 60, 5561.11),
+    (1200, 0.0, 12, 100.00),
+]
+
+def closed_form_emi(p, annual_rate, n):
+    r = annual_rate / 12 / 100
+    if r == 0:
+        return p / n
+    return p * r * (1 + r) ** n / ((1 + r) ** n - 1)
+
+def closed_form_balance(p, annual_rate, n, k):
+    r = annual_rate / 12 / 100
+    emi = closed_form_emi(p, annual_rate, n)
+    if r == 0:
+        return p - k * emi
+    return p * (1 + r) ** k - emi * ((1 + r) ** k - 1) / r
+
+def verify_amortization():
+    ok = True
+
+    # 1. EMI against hand-computed values and the scalar closed form
+    principal, rate, tenure, expected = map(np.array, zip(*KNOWN_EMIS))
+    emi = monthly_emi(principal, rate, tenure)
+    for (p, r, n, want), got in zip(KNOWN_EMIS, emi):
+        if round(float(got), 2) != want or abs(got - closed_form_emi(p, r, n)) > 1e-6:
+            print(f"FAILURE: EMI for {p} @ {r}% x {n} = {got:.4f}, expected {want}")
+            ok = False
+
+    # 2. Schedules: balances match the closed form, principal sums to P, EMI = principal + interest
+    schedule = amortize(principal, rate, tenure)
+    for i, (p, r, n, _) in enumerate(KNOWN_EMIS):
+        for k in (1, n // 2, n - 1):
+            if abs(schedule["balance"][i, k - 1] - closed_form_balance(p, r, n, k)) > 1e-6 * p:
+                print(f"FAILURE: balance after {k} months for loan {i} = {schedule['balance'][i, k - 1]}")
+                ok = False
+        if schedule["balance"][i, n - 1] != 0 or np.any(schedule["principal"][i, n:] != 0):
+            print(f"FAILURE: loan {i} not closed after {n} months")
+            ok = False
+        if abs(schedule["principal"][i].sum() - p) > 1e-6 * p:
+            print(f"FAILURE: principal of loan {i} sums to {schedule['principal'][i].sum()}, expected {p}")
+            ok = False
+        paid = schedule["principal"][i, :n] + schedule["interest"][i, :n]
+        if not np.allclose(paid, emi[i]):
+            print(f"FAILURE: principal + interest != EMI for loan {i}")
+            ok = False
+
+    # 3. Scalars and Decimals (as stored on LoanApplication.amount) work too
+    if abs(monthly_emi(Decimal("100000.00"), 10.0, 12)[0] - closed_form_emi(100000, 10.0, 12)) > 1e-9:
+        print("FAILURE: Decimal principal")
+        ok = False
+
+    # 4. Portfolio projection: chunked totals equal the per-loan schedules
+    rng = np.random.default_rng(0)
+    n_loans = 10000
+    p = rng.uniform(10000, 1000000, n_loans)
+    r = rng.choice([0.0, 8.5, 10.0, 14.0], n_loans)
+    n = rng.integers(6, 120, n_loans)
+    offset = rng.integers(-60, 12, n_loans)
+    horizon = 24
+    flows = project_cash_flows(p, r, n, offset, horizon)
+
+    full = amortize(p, r, n)
+    expected_interest = np.zeros(horizon)
+    for i in range(n_loans):
+        for m in range(n[i]):
+            month = offset[i] + m
+            if 0 <= month < horizon:
+                expected_interest[month] += full["interest"][i, m]
+    if not np.allclose(flows["interest"], expected_interest):
+        print("FAILURE: projected interest differs from per-loan schedules")
+        ok = False
+    if not np.allclose(flows["total"], flows["principal"] + flows["interest"]):
+        print("FAILURE: projected total != principal + interest")
+        ok = False
+
+    if ok:
+        print("SUCCESS: amortization matches closed-form EMI, balances and portfolio totals")
+    return ok
+
+if __name__ == "__main__":
+    verify_amortization()
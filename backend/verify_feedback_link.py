@@ -3,6 +3,7 @@ from extensions import db
 from models.user import User
 from models.loan_applications import LoanApplication
 from controllers.loan_controller import apply_for_loan
+from ml.scoring_queue import ScoringWorker
 # from flask_jwt_extended import create_access_token - Not used, causing error
 
 # We need to mock get_jwt_identity since apply_for_loan uses it.
@@ -43,6 +44,9 @@ def verify_link():
             
             if status == 201:
                 loan_id = result['loan_id']
+
+                # Scoring is queued; drain the queue the way `flask score-loans` would
+                ScoringWorker(app).run(once=True)
                 loan = LoanApplication.query.get(loan_id)
                 
                 print(f"Loan ID: {loan.id}")
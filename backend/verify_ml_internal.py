@@ -1,6 +1,7 @@
 from app import create_app
 from extensions import db
 from ml.predictor import predictor
+from ml.log_writer import log_writer
 from models.prediction_log import PredictionLog
 
 def verify_internal():
@@ -27,6 +28,7 @@ def verify_internal():
         try:
             result = predictor.predict(data)
             print("Prediction Result:", result)
+            log_writer.flush() # Wait for the write-behind queue
         except Exception as e:
             print(f"Prediction Failed: {e}")
             return
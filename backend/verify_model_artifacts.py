@@ -0,0 +1,95 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from ml.registry import model_registry, ModelRegistry, export_linear_artifact, MODEL_FILE, SCALER_FILE
+from ml.features import encode_frame
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(BACKEND_DIR, '../ml/loan_approval_dataset.csv')
+
+# Fresh processes per format for the startup comparison
+RUNS = 5
+
+# Loads the model in a fresh interpreter and prints the seconds it took
+# (imports included, which is where unpickling sklearn objects costs the most)
+LOAD_SNIPPET = """
+import time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+from ml.registry import ModelRegistry
+bundle = ModelRegistry(artifacts_dir={missing!r}, legacy_dir={directory!r}).get()
+assert bundle is not None
+print(time.perf_counter() - start)
+"""
+
+def make_artifact_dirs(source_dir, workdir):
+    """Copy the active pickles into two dirs: pickles only, and pickles + model.npy."""
+    dirs = {}
+    for name in ('pickle', 'npy'):
+        path = os.path.join(workdir, name)
+        os.makedirs(path)
+        for file_name in (MODEL_FILE, SCALER_FILE):
+            shutil.copy(os.path.join(source_dir, file_name), path)
+        dirs[name] = path
+    export_linear_artifact(dirs['npy'])
+    return dirs
+
+def is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+def startup_seconds(directory, missing):
+    code = LOAD_SNIPPET.format(directory=directory, missing=missing)
+    times = []
+    for _ in range(RUNS):
+        out = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return float(np.median(times))
+
+def verify_artifacts():
+    source = model_registry.get()
+    if source is None:
+        print("FAILURE: No model could be loaded.")
+        return
+
+    workdir = tempfile.mkdtemp()
+    missing = os.path.join(workdir, 'no-artifacts')
+    try:
+        dirs = make_artifact_dirs(source.path, workdir)
+        pickle_bundle = ModelRegistry(artifacts_dir=missing, legacy_dir=dirs['pickle']).get()
+        npy_bundle = ModelRegistry(artifacts_dir=missing, legacy_dir=dirs['npy']).get()
+
+        # 1. The memory-mapped export scores exactly like the pickles
+        features = encode_frame(pd.read_csv(DATASET_PATH), pickle_bundle.feature_order)
+        p_labels, p_probs, p_contribs = pickle_bundle.score(features)
+        n_labels, n_probs, n_contribs = npy_bundle.score(features)
+
+        same = (
+            npy_bundle.feature_order == pickle_bundle.feature_order
+            and (p_labels == n_labels).all()
+            and np.abs(p_probs - n_probs).max() < 1e-12
+            and np.abs(p_contribs - n_contribs).max() < 1e-12
+        )
+        print(f"model.npy size: {os.path.getsize(os.path.join(dirs['npy'], 'model.npy'))} bytes")
+        print(f"Mapped read-only: {is_memory_mapped(npy_bundle.engine.weights)}")
+        print("SUCCESS: model.npy matches the pickles." if same else "FAILURE: model.npy diverges from the pickles.")
+
+        # 2. Cold start in a fresh process
+        pickle_s = startup_seconds(dirs['pickle'], missing)
+        npy_s = startup_seconds(dirs['npy'], missing)
+        print(f"\nStartup (median of {RUNS} fresh processes)")
+        print(f"Pickles:   {pickle_s * 1000:.1f} ms")
+        print(f"model.npy: {npy_s * 1000:.1f} ms")
+        print(f"Speedup: {pickle_s / npy_s:.1f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    verify_artifacts()
@@ -0,0 +1,78 @@
+import os
+import pickle
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from ml.registry import model_registry, MODEL_FILE, SCALER_FILE
+from ml.features import encode_frame
+from ml.scoring_engine import ScoringEngine
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../ml/loan_approval_dataset.csv')
+
+# Single-row latency loop size
+ITERATIONS = 2000
+
+def load_features(feature_order):
+    return encode_frame(pd.read_csv(DATASET_PATH), feature_order)
+
+def sklearn_score(model, scaler, features):
+    # The path LoanPredictor used before the fused engine
+    features_scaled = scaler.transform(features)
+    labels = model.predict(features_scaled)
+    probabilities = model.predict_proba(features_scaled)[:, 1]
+    contributions = features_scaled * model.coef_[0]
+    return labels, probabilities, contributions
+
+def time_per_call(fn, row):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn(row)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+def verify_engine():
+    # sklearn warns about missing feature names on every ndarray call
+    warnings.filterwarnings("ignore")
+
+    # Compare against the sklearn pickles, even if the registry serves model.npy
+    bundle = model_registry.get()
+    with open(os.path.join(bundle.path, MODEL_FILE), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(bundle.path, SCALER_FILE), 'rb') as f:
+        scaler = pickle.load(f)
+    if not ScoringEngine.supports(model, scaler):
+        print("FAILURE: Loaded model cannot be compiled into a ScoringEngine.")
+        return
+
+    engine = ScoringEngine.from_sklearn(model, scaler)
+    features = load_features(bundle.feature_order)
+
+    # 1. Parity against sklearn on the whole dataset
+    sk_labels, sk_probs, sk_contribs = sklearn_score(model, scaler, features)
+    labels, probs, contribs = engine.score(features)
+
+    label_mismatches = int((sk_labels != labels).sum())
+    max_prob_diff = float(np.abs(sk_probs - probs).max())
+    max_contrib_diff = float(np.abs(sk_contribs - contribs).max())
+
+    print(f"Rows compared: {len(features)}")
+    print(f"Label mismatches: {label_mismatches}")
+    print(f"Max probability diff: {max_prob_diff:.2e}")
+    print(f"Max contribution diff: {max_contrib_diff:.2e}")
+
+    if label_mismatches == 0 and max_prob_diff < 1e-9 and max_contrib_diff < 1e-9:
+        print("SUCCESS: Fused engine matches sklearn.")
+    else:
+        print("FAILURE: Fused engine diverges from sklearn.")
+
+    # 2. Single-row latency (the /api/ml/predict shape)
+    row = features[:1]
+    sklearn_us = time_per_call(lambda r: sklearn_score(model, scaler, r), row)
+    engine_us = time_per_call(engine.score, row)
+
+    print(f"\nsklearn path: {sklearn_us:.1f} us/row")
+    print(f"Fused engine: {engine_us:.1f} us/row")
+    print(f"Speedup: {sklearn_us / engine_us:.1f}x")
+
+if __name__ == "__main__":
+    verify_engine()